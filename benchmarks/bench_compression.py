@@ -0,0 +1,149 @@
+"""
+Bytes on the wire with and without compression, for the benchmark payloads.
+
+Starts a stub SearXNG that compresses as asked and the server over stateless
+streamable http, then calls `search` in every format with each
+Accept-Encoding. Prints a json report per result count with the response
+bytes the server sent for each format and coding, and the SearXNG response
+bytes it received per search, compressed and decoded, from its metrics.
+
+    python benchmarks/bench_compression.py --results 10 50
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_load import MAIN, free_port  # noqa: E402
+from stub_searxng import ENCODERS, FORMATS, StubSearxng  # noqa: E402
+
+HEADERS = {
+    "Accept": "application/json, text/event-stream",
+    "Content-Type": "application/json",
+}
+
+
+def wait_until_serving(http: httpx.Client, deadline: float = 30.0) -> None:
+    started = time.perf_counter()
+    while True:
+        try:
+            http.get("/metrics")
+            return
+        except httpx.TransportError:
+            if time.perf_counter() - started > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def metric(http: httpx.Client, name: str) -> float:
+    for line in http.get("/metrics").text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    return 0.0
+
+
+def call_search(http: httpx.Client, query: str, format: str, encoding: str) -> int:
+    "Bytes the server sent for one search call, as received."
+    request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": "search", "arguments": {"q": query, "format": format}},
+    }
+    with http.stream(
+        "POST",
+        "/mcp/",
+        json=request,
+        headers={**HEADERS, "Accept-Encoding": encoding},
+    ) as response:
+        response.raise_for_status()
+        response.read()
+        return response.num_bytes_downloaded
+
+
+def measure(results: int, args: argparse.Namespace) -> dict:
+    encodings = ["identity", *ENCODERS]
+    with StubSearxng(results=results, compress=True) as stub:
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                str(MAIN),
+                "http",
+                "--no-show-banner",
+                "--host=127.0.0.1",
+                f"--port={port}",
+                "--log-level=warning",
+                "--stateless-http",
+            ],
+            env={
+                **os.environ,
+                "SEARXNG_URL": stub.url,
+                "SEARXNG_CAPABILITIES_REFRESH": "0",
+            },
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as http:
+                wait_until_serving(http)
+                downstream = {
+                    format: {
+                        encoding: call_search(
+                            http, f"compress {format} {encoding}", format, encoding
+                        )
+                        for encoding in encodings
+                    }
+                    for format in args.formats
+                }
+                searches = len(args.formats) * len(encodings)
+                decoded = metric(http, "searxng_mcp_upstream_received_bytes_total")
+                wire = metric(http, "searxng_mcp_upstream_wire_bytes_total")
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {
+        "upstream_per_search": {
+            "decoded_bytes": round(decoded / searches),
+            "wire_bytes": round(wire / searches),
+        },
+        "downstream": downstream,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--results",
+        type=int,
+        nargs="+",
+        default=[10, 50],
+        help="Results per stub SearXNG answer, one report each.",
+    )
+    parser.add_argument(
+        "--formats",
+        type=lambda value: value.split(","),
+        default=list(FORMATS),
+        help=f"Comma separated formats, of {', '.join(FORMATS)}.",
+    )
+    parser.add_argument("--output", type=Path, help="Also write the report here.")
+    args = parser.parse_args()
+
+    report = {f"results_{n}": measure(n, args) for n in args.results}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output is not None:
+        args.output.write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Throughput and latency of the server under concurrent load.
+
+Starts a stub SearXNG and the server, over stdio (one session multiplexing all
+callers, as a single MCP client does) and over streamable http (one session
+per caller), then runs `--clients` concurrent callers issuing `--requests`
+searches each. Prints a json report per transport with requests per second,
+p50/p95/p99 latency, errors and the server's peak RSS and open sockets.
+
+    python benchmarks/bench_load.py --clients 50 --requests 20 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport, StreamableHttpTransport
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_searxng import FORMATS, StubSearxng  # noqa: E402
+
+MAIN = Path(__file__).resolve().parents[1] / "searxng_mcp" / "main.py"
+
+
+def child_pids(pid: int) -> list[int]:
+    "Direct children of `pid`, read from /proc."
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(stat.parent.name))
+    return children
+
+
+def process_usage(pid: int) -> tuple[int | None, int | None]:
+    "Resident memory in bytes and open sockets of `pid`, if /proc is available."
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+        rss = next(
+            int(line.split()[1]) * 1024
+            for line in status.splitlines()
+            if line.startswith("VmRSS:")
+        )
+        sockets = sum(
+            1
+            for fd in Path(f"/proc/{pid}/fd").iterdir()
+            if os.readlink(fd).startswith("socket:")
+        )
+    except (OSError, StopIteration):
+        return None, None
+    return rss, sockets
+
+
+class UsageSampler:
+    "Tracks the peak resource usage of the server process during a run."
+
+    def __init__(self, pid: int | None):
+        self.pid = pid
+        self.peak_rss: int | None = None
+        self.peak_sockets: int | None = None
+
+    def sample(self) -> None:
+        if self.pid is None:
+            return
+        rss, sockets = process_usage(self.pid)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+            self.peak_sockets = max(self.peak_sockets or 0, sockets)
+
+    async def run(self, interval: float = 0.1) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(interval)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def caller(
+    client: Client, index: int, args: argparse.Namespace, latencies: list[float]
+) -> int:
+    errors = 0
+    for n in range(args.requests):
+        call = index * args.requests + n
+        number = call % args.distinct_queries if args.distinct_queries else call
+        query = f"load {number}"
+        format = args.formats[call % len(args.formats)]
+        started = time.perf_counter()
+        try:
+            await client.call_tool("search", {"q": query, "format": format})
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    return errors
+
+
+async def drive(
+    clients: list[Client], args: argparse.Namespace, sampler: UsageSampler
+) -> dict:
+    latencies: list[float] = []
+    sampling = asyncio.create_task(sampler.run())
+    started = time.perf_counter()
+    errors = await asyncio.gather(
+        *(
+            caller(clients[i % len(clients)], i, args, latencies)
+            for i in range(args.clients)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    sampling.cancel()
+    sampler.sample()
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2) if ordered else None,
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2) if ordered else None,
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2) if ordered else None,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else None,
+        "peak_rss_bytes": sampler.peak_rss,
+        "peak_open_sockets": sampler.peak_sockets,
+    }
+
+
+async def run_stdio(args: argparse.Namespace, env: dict[str, str]) -> dict:
+    transport = PythonStdioTransport(
+        MAIN, args=["stdio", "--no-show-banner"], env=env, keep_alive=False
+    )
+    async with Client(transport, timeout=60) as client:
+        await client.list_tools()
+        children = child_pids(os.getpid())
+        sampler = UsageSampler(children[0] if len(children) == 1 else None)
+        return await drive([client], args, sampler)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_serving(url: str, deadline: float = 30.0) -> None:
+    async with httpx.AsyncClient() as http:
+        started = time.perf_counter()
+        while True:
+            try:
+                await http.get(url)
+                return
+            except httpx.TransportError:
+                if time.perf_counter() - started > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+async def run_http(args: argparse.Namespace, env: dict[str, str]) -> dict:
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            str(MAIN),
+            "http",
+            "--no-show-banner",
+            "--host=127.0.0.1",
+            f"--port={port}",
+            "--log-level=warning",
+            f"--workers={args.workers}",
+        ],
+        env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        await wait_until_serving(f"{base}/metrics")
+        clients = [
+            Client(StreamableHttpTransport(f"{base}/mcp"), timeout=60)
+            for _ in range(args.clients)
+        ]
+        for client in clients:
+            await client.__aenter__()
+        # With several workers, the supervisor's usage says little.
+        sampler = UsageSampler(server.pid if args.workers == 1 else None)
+        try:
+            return await drive(clients, args, sampler)
+        finally:
+            for client in clients:
+                await client.__aexit__(None, None, None)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--transport", choices=["stdio", "http", "both"], default="both"
+    )
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=20, help="Per client.")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stub SearXNG delay in seconds."
+    )
+    parser.add_argument(
+        "--results", type=int, default=10, help="Results per stub SearXNG answer."
+    )
+    parser.add_argument(
+        "--formats",
+        type=lambda value: value.split(","),
+        default=["json"],
+        help=f"Comma separated formats cycled through, of {', '.join(FORMATS)}.",
+    )
+    parser.add_argument(
+        "--distinct-queries",
+        type=int,
+        default=0,
+        help="Cycle through this many queries to exercise the cache, 0 for all new.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Server processes in http mode."
+    )
+    parser.add_argument("--output", type=Path, help="Also write the report here.")
+    args = parser.parse_args()
+
+    with StubSearxng(latency=args.latency, results=args.results) as stub:
+        env = {
+            **os.environ,
+            "SEARXNG_URL": stub.url,
+            "SEARXNG_CONCURRENCY_LIMIT": str(max(args.clients, 20)),
+        }
+        report = {
+            "config": {
+                key: value for key, value in vars(args).items() if key != "output"
+            },
+        }
+        if args.transport in ("stdio", "both"):
+            report["stdio"] = asyncio.run(run_stdio(args, env))
+        if args.transport in ("http", "both"):
+            report["http"] = asyncio.run(run_http(args, env))
+
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.output is not None:
+        args.output.write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-call cost of encoding `search` arguments.
+
+Compares the original `parse_args`, which inspects the signature on every call,
+with the `ArgsEncoder` that `SearxngClient` compiles once.
+
+    python benchmarks/bench_parse_args.py
+"""
+
+import sys
+import timeit
+from collections.abc import Callable
+from enum import Enum
+from inspect import Parameter, signature
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "searxng_mcp"))
+
+from searxng_client import (  # noqa: E402
+    _CONTROL_PARAMS,
+    ArgsEncoder,
+    Categories,
+    Engines,
+    Plugins,
+    SearxngClient,
+)
+
+
+def legacy_parse_args(
+    func: Callable[..., Any], raw_args: dict[str, Any]
+) -> dict[str, Any]:
+    "`parse_args` as it was before the encoder was introduced."
+    sig = signature(func)
+    cleaned = {}
+    for name, param in sig.parameters.items():
+        if name in _CONTROL_PARAMS:
+            continue
+        is_optional = param.default is not Parameter.empty or getattr(
+            param.annotation, "__origin__", None
+        ) is type(None)
+        if name not in raw_args:
+            if is_optional:
+                continue
+            raise ValueError(name)
+        value = raw_args[name]
+        if value in ("", [], None):
+            if not is_optional:
+                raise ValueError(name)
+            continue
+        if type(value).__name__ == "list":
+            if all(isinstance(item, Enum) for item in value):
+                value = ", ".join([item.value for item in value])
+        cleaned[name] = value
+    return cleaned
+
+
+def main(number: int = 20_000) -> None:
+    client = SearxngClient("http://localhost:8181")
+    raw_args = {
+        name: param.default
+        for name, param in signature(client.search).parameters.items()
+    }
+    raw_args.update(
+        q="benchmark query",
+        categories=[Categories.general, Categories.it],
+        engines=[Engines.google, Engines.duckduckgo, Engines.bing],
+        enabled_plugins=[Plugins.hash_plugin],
+        language="en",
+    )
+    encoder = ArgsEncoder(client.search, exclude=_CONTROL_PARAMS)
+    assert encoder(raw_args) == legacy_parse_args(client.search, raw_args)
+
+    timings = {
+        "legacy parse_args": timeit.timeit(
+            lambda: legacy_parse_args(client.search, raw_args), number=number
+        ),
+        "compiled ArgsEncoder": timeit.timeit(lambda: encoder(raw_args), number=number),
+        "ArgsEncoder + cache key": timeit.timeit(
+            lambda: encoder.key(encoder(raw_args)), number=number
+        ),
+    }
+    baseline = timings["legacy parse_args"]
+    for name, total in timings.items():
+        per_call = total / number * 1e6
+        print(f"{name:<26} {per_call:8.2f} us/call  {baseline / total:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
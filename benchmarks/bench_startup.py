@@ -0,0 +1,71 @@
+"""
+Cold start of the stdio server, as launched by MCP clients for every run.
+
+Spawns `main.py stdio` against a stub SearXNG and reports the time from spawn
+to the first `list_tools` answer and to the first `search` result.
+
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 1500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_searxng import StubSearxng  # noqa: E402
+
+MAIN = Path(__file__).resolve().parents[1] / "searxng_mcp" / "main.py"
+
+
+async def measure(env: dict[str, str]) -> tuple[float, float]:
+    transport = PythonStdioTransport(
+        MAIN, args=["stdio", "--no-show-banner"], env=env, keep_alive=False
+    )
+    started = time.perf_counter()
+    async with Client(transport) as client:
+        await client.list_tools()
+        list_tools = time.perf_counter() - started
+        await client.call_tool("search", {"q": "startup"})
+        search = time.perf_counter() - started
+    return list_tools, search
+
+
+async def run(runs: int, upstream: str) -> dict[str, float]:
+    env = {**os.environ, "SEARXNG_URL": upstream}
+    samples = [await measure(env) for _ in range(runs)]
+    return {
+        "list_tools_ms": statistics.median(s[0] for s in samples) * 1000,
+        "search_ms": statistics.median(s[1] for s in samples) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Exit non-zero when the median time to first search exceeds this.",
+    )
+    args = parser.parse_args()
+
+    with StubSearxng() as stub:
+        report = asyncio.run(run(args.runs, stub.url))
+    print(json.dumps(report, indent=2))
+
+    if args.budget_ms is not None and report["search_ms"] > args.budget_ms:
+        sys.exit(f"time to first search exceeds {args.budget_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Minimal stand-in for a SearXNG instance, for benchmarks.
+
+Serves `/search` in the json, html, csv and rss formats, plus `/healthz`, from
+a background thread so it can run next to the server under test. Every answer
+can be delayed by `latency` seconds and carries `results` results, and is
+compressed as the client accepts when `compress` is set.
+"""
+
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def search_document(query: str, results: int = 10) -> dict:
+    return {
+        "query": query,
+        "number_of_results": results,
+        "results": [
+            {
+                "url": f"https://example.com/{i}",
+                "title": f"{query} result {i}",
+                "content": f"Snippet {i} for {query}. " * 8,
+                "engine": "stub",
+            }
+            for i in range(results)
+        ],
+        "answers": [],
+        "corrections": [],
+        "infoboxes": [],
+        "suggestions": [],
+        "unresponsive_engines": [],
+    }
+
+
+def render_html(document: dict) -> str:
+    items = "".join(
+        f'<article class="result"><h3><a href="{escape(r["url"])}">'
+        f'{escape(r["title"])}</a></h3><p class="content">{escape(r["content"])}'
+        "</p></article>"
+        for r in document["results"]
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>{escape(document['query'])}</title>"
+        f'</head><body><main id="results">{items}</main></body></html>'
+    )
+
+
+def render_csv(document: dict) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["title", "url", "content", "host", "engine", "score", "type"])
+    for r in document["results"]:
+        writer.writerow(
+            [
+                r["title"],
+                r["url"],
+                r["content"],
+                "example.com",
+                r["engine"],
+                1,
+                "result",
+            ]
+        )
+    return out.getvalue()
+
+
+def render_rss(document: dict) -> str:
+    items = "".join(
+        f"<item><title>{escape(r['title'])}</title><link>{escape(r['url'])}</link>"
+        f"<description>{escape(r['content'])}</description></item>"
+        for r in document["results"]
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>SearXNG search: {escape(document['query'])}</title>{items}"
+        "</channel></rss>"
+    )
+
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content codings the stub can answer with, most preferred first.
+ENCODERS = {
+    **({"zstd": lambda body: zstandard.compress(body, 3)} if zstandard else {}),
+    **({"br": lambda body: brotli.compress(body, quality=4)} if brotli else {}),
+    "gzip": lambda body: gzip.compress(body, 6),
+}
+
+
+FORMATS = {
+    "json": (lambda document: json.dumps(document), "application/json"),
+    "html": (render_html, "text/html; charset=utf-8"),
+    "csv": (render_csv, "text/csv; charset=utf-8"),
+    "rss": (render_rss, "application/rss+xml; charset=utf-8"),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/healthz":
+            self._send(b"OK", "text/plain")
+            return
+        if url.path != "/search":
+            self.send_error(404)
+            return
+        params = parse_qs(url.query)
+        query = params.get("q", [""])[0]
+        format = params.get("format", ["json"])[0]
+        if format not in FORMATS:
+            self.send_error(403)
+            return
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        render, content_type = FORMATS[format]
+        document = search_document(query, self.server.results)
+        self._send(render(document).encode(), content_type)
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if self.server.compress:
+            accepted = self.headers.get("Accept-Encoding", "")
+            encoding = next((e for e in ENCODERS if e in accepted), None)
+            if encoding is not None:
+                body = ENCODERS[encoding](body)
+                self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubSearxng:
+    "Runs `StubHandler` on a free local port until stopped."
+
+    def __init__(
+        self,
+        handler: type[BaseHTTPRequestHandler] = StubHandler,
+        latency: float = 0.0,
+        results: int = 10,
+        compress: bool = False,
+    ):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.results = results
+        self.server.compress = compress
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubSearxng":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,144 @@
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from itertools import chain
+from typing import Any
+
+
+def normalize_prefix(text: str) -> str:
+    "Lower cases `text` and collapses its whitespace, keeping a trailing space."
+    prefix = " ".join(text.casefold().split())
+    if prefix and text[-1:].isspace():
+        # "py " and "py" complete differently.
+        prefix += " "
+    return prefix
+
+
+def parse_suggestions(document: Any) -> list[str]:
+    """
+    Suggestions from an `/autocompleter` answer: either a plain list, or the
+    OpenSearch `[query, [suggestions]]` pair SearXNG sends to browsers.
+    """
+    if (
+        isinstance(document, list)
+        and len(document) == 2
+        and isinstance(document[0], str)
+        and isinstance(document[1], list)
+    ):
+        document = document[1]
+    if not isinstance(document, list):
+        return []
+    return [item for item in document if isinstance(item, str)]
+
+
+class _Node:
+    __slots__ = ("children", "expires_at", "suggestions")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.suggestions: list[str] | None = None
+        self.expires_at = 0.0
+
+
+class PrefixCache:
+    """
+    Autocomplete suggestions cached in a prefix trie.
+
+    Each looked up prefix stores its suggestions on its trie node. A prefix
+    with no fresh entry of its own is answered from its neighbours: the
+    suggestions of shorter prefixes on the path to it and of longer prefixes
+    below it, filtered to those starting with it. That counts as a hit once
+    `min_suggestions` are found, and at most `max_suggestions` are returned.
+    Entries expire after `ttl` seconds and the least recently stored are
+    dropped beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = 600.0,
+        min_suggestions: int = 5,
+        max_suggestions: int = 10,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_suggestions = min_suggestions
+        self.max_suggestions = max_suggestions
+        self.hits = 0
+        self.derived_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._root = _Node()
+        self._order: OrderedDict[str, None] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _fresh(self, node: _Node, now: float) -> list[str] | None:
+        return node.suggestions if node.expires_at > now else None
+
+    def get(self, prefix: str) -> list[str] | None:
+        now = time.monotonic()
+        path = [self._root]
+        for char in prefix:
+            child = path[-1].children.get(char)
+            if child is None:
+                break
+            path.append(child)
+        node = path[-1] if len(path) == len(prefix) + 1 else None
+        if node is not None:
+            exact = self._fresh(node, now)
+            if exact is not None:
+                self.hits += 1
+                return exact
+
+        # Nearest shorter prefixes first, then longer ones level by level.
+        ancestors = reversed(path[:-1] if node is not None else path)
+        descendants = self._below(node) if node is not None else ()
+        found: dict[str, None] = {}
+        for source in chain(ancestors, descendants):
+            for suggestion in self._fresh(source, now) or []:
+                if suggestion.casefold().startswith(prefix):
+                    found[suggestion] = None
+            if len(found) >= self.max_suggestions:
+                break
+        if len(found) >= self.min_suggestions:
+            self.derived_hits += 1
+            return list(found)[: self.max_suggestions]
+        self.misses += 1
+        return None
+
+    def _below(self, node: _Node) -> Iterator[_Node]:
+        "Descendants of `node`, shortest prefixes first."
+        level = list(node.children.values())
+        while level:
+            yield from level
+            level = [child for parent in level for child in parent.children.values()]
+
+    def set(self, prefix: str, suggestions: list[str]) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _Node())
+        node.suggestions = suggestions
+        node.expires_at = time.monotonic() + self.ttl
+        self._order[prefix] = None
+        self._order.move_to_end(prefix)
+        while len(self._order) > self.max_entries:
+            oldest, _ = self._order.popitem(last=False)
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, prefix: str) -> None:
+        path = [self._root]
+        for char in prefix:
+            path.append(path[-1].children[char])
+        path[-1].suggestions = None
+        # Prune the nodes left with neither an entry nor children.
+        for parent, char, node in zip(
+            reversed(path[:-1]), reversed(prefix), reversed(path[1:])
+        ):
+            if node.suggestions is not None or node.children:
+                break
+            del parent.children[char]
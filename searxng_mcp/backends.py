@@ -0,0 +1,97 @@
+import asyncio
+import time
+from typing import Collection, Literal, Sequence
+
+from httpx import AsyncClient, HTTPError
+
+BalancingStrategy = Literal["least_outstanding", "ewma"]
+
+
+class Backend:
+    "A single SearXNG instance and its observed health."
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.ewma_latency = 0.0
+        self.failures = 0
+        self.ejected = False
+
+    def __repr__(self) -> str:
+        return f"Backend({self.url!r})"
+
+    def endpoint(self, path: str) -> str:
+        return f"{self.url}/{path.lstrip('/')}"
+
+
+class BackendPool:
+    """
+    Spreads requests over several SearXNG instances.
+
+    `least_outstanding` picks the instance with the fewest requests in flight,
+    `ewma` weighs that count by each instance's moving average latency.
+    Instances failing `max_failures` times in a row are ejected until a
+    background probe of `probe_path` succeeds again.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        strategy: BalancingStrategy = "least_outstanding",
+        max_failures: int = 3,
+        probe_interval: float = 10.0,
+        probe_path: str = "/healthz",
+        ewma_decay: float = 0.3,
+    ):
+        if not urls:
+            raise ValueError("At least one SearXNG url is required.")
+        self.backends = [Backend(url) for url in urls]
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.probe_interval = probe_interval
+        self.probe_path = probe_path
+        self.ewma_decay = ewma_decay
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def select(self, exclude: Collection[Backend] = ()) -> Backend:
+        candidates = [b for b in self.backends if b not in exclude] or self.backends
+        # Fail open: with every candidate ejected, still try the least bad one.
+        healthy = [b for b in candidates if not b.ejected] or candidates
+        match self.strategy:
+            case "ewma":
+                return min(healthy, key=lambda b: b.ewma_latency * (b.outstanding + 1))
+            case _:
+                return min(healthy, key=lambda b: (b.outstanding, b.ewma_latency))
+
+    def observe(self, backend: Backend, latency: float, ok: bool) -> None:
+        if backend.ewma_latency == 0.0:
+            backend.ewma_latency = latency
+        else:
+            backend.ewma_latency += self.ewma_decay * (latency - backend.ewma_latency)
+
+        if ok:
+            backend.failures = 0
+            backend.ejected = False
+            return
+        backend.failures += 1
+        if backend.failures >= self.max_failures:
+            backend.ejected = True
+
+    async def probe(self, client: AsyncClient) -> None:
+        "Checks every ejected backend once and reinstates those that answer."
+        for backend in [b for b in self.backends if b.ejected]:
+            started = time.perf_counter()
+            try:
+                response = await client.get(backend.endpoint(self.probe_path))
+                ok = response.is_success
+            except HTTPError:
+                ok = False
+            if ok:
+                self.observe(backend, time.perf_counter() - started, ok=True)
+
+    async def run_prober(self, client: AsyncClient) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self.probe(client)
@@ -0,0 +1,56 @@
+import time
+
+
+class CircuitOpen(Exception):
+    "Raised instead of calling an upstream that is known to be down."
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after `failure_threshold` failures in a row.
+
+    While open every call fails immediately. After `reset_timeout` seconds a
+    single trial call is let through: its success closes the circuit again,
+    its failure keeps it open for another `reset_timeout`. A threshold of 0
+    disables the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        if self.opened_at is None:
+            return
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpen(f"Retrying in {remaining:.0f} seconds.")
+        if self._trial_running:
+            raise CircuitOpen("A trial request is in progress.")
+        self._trial_running = True
+
+    def record(self, ok: bool) -> None:
+        self._trial_running = False
+        if ok:
+            self.failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        tripped = 0 < self.failure_threshold <= self.failures
+        if tripped or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        "Ends a call whose outcome says nothing about the upstream's health."
+        self._trial_running = False
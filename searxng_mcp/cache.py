@@ -0,0 +1,106 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Collection, Hashable, Mapping, NamedTuple
+
+
+def canonical_key(
+    args: Mapping[str, Any],
+    defaults: Mapping[str, Any] | None = None,
+    list_params: Collection[str] = (),
+) -> str:
+    """
+    Builds a stable cache key from `parse_args` output.
+
+    Whitespace in `q` is collapsed, list parameters are sorted and values equal
+    to their default are dropped, so equivalent searches share one key.
+    """
+    defaults = defaults or {}
+    canonical = {}
+    for name, value in args.items():
+        if name in defaults and defaults[name] == value:
+            continue
+        if name == "q" and isinstance(value, str):
+            value = " ".join(value.split())
+        elif name in list_params:
+            items = value.split(",") if isinstance(value, str) else value
+            value = sorted({str(item).strip() for item in items})
+        canonical[name] = value
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ResultCache:
+    """
+    Bounded in-memory LRU cache with per-entry TTLs.
+
+    Entries are evicted least recently used first once either `max_entries` or
+    `max_bytes` is exceeded. Sizes are supplied by the caller on `set`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        ttls: Mapping[str, float] | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def ttl_for(self, kind: str | None) -> float:
+        if kind is None:
+            return self.default_ttl
+        return self.ttls.get(kind, self.default_ttl)
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, size: int, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, size, time.monotonic() + ttl)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,88 @@
+from typing import Any, Literal
+
+UnsupportedPolicy = Literal["strip", "reject", "ignore"]
+
+# Search arguments naming engines, categories or plugins, and what they accept.
+# Engines only need to exist, as SearXNG runs disabled ones when named.
+_CHECKED_ARGS = {
+    "engines": "engine",
+    "enabled_engines": "engine",
+    "disabled_engines": "engine",
+    "categories": "category",
+    "enabled_plugins": "plugin",
+    "disabled_plugins": "plugin",
+}
+
+
+def _split(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _plugin_key(name: str) -> str:
+    "Matches a `Plugins` id like Hash_plugin to its /config name, Hash plugin."
+    return name.replace(" ", "_").casefold()
+
+
+class CapabilityIndex:
+    "What a SearXNG instance supports, built from its `/config` document."
+
+    def __init__(self, config: dict[str, Any]):
+        self.version = config.get("version")
+        self.engines: dict[str, bool] = {}
+        self.categories: dict[str, dict[str, bool]] = {
+            category: {} for category in config.get("categories") or []
+        }
+        for engine in config.get("engines") or []:
+            name = engine.get("name")
+            if not name:
+                continue
+            enabled = bool(engine.get("enabled", True))
+            self.engines[name] = enabled
+            for category in engine.get("categories") or []:
+                self.categories.setdefault(category, {})[name] = enabled
+        self.plugins: dict[str, bool] = {
+            plugin["name"]: bool(plugin.get("enabled", True))
+            for plugin in config.get("plugins") or []
+            if plugin.get("name")
+        }
+        self._plugin_keys = {_plugin_key(name) for name in self.plugins}
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "version": self.version,
+            "categories": self.categories,
+            "engines": self.engines,
+            "plugins": self.plugins,
+        }
+
+    def _supports(self, kind: str, name: str) -> bool:
+        match kind:
+            case "engine":
+                return name in self.engines
+            case "category":
+                return name in self.categories
+            case _:
+                return _plugin_key(name) in self._plugin_keys
+
+    def unsupported(self, args: dict[str, Any]) -> dict[str, list[str]]:
+        "Names in encoded search `args` the instance does not support, by argument."
+        found = {}
+        for arg, kind in _CHECKED_ARGS.items():
+            if arg in args:
+                names = [n for n in _split(args[arg]) if not self._supports(kind, n)]
+                if names:
+                    found[arg] = names
+        return found
+
+    def strip(
+        self, args: dict[str, Any], unsupported: dict[str, list[str]]
+    ) -> dict[str, Any]:
+        "`args` without the `unsupported` names, dropping arguments left empty."
+        args = dict(args)
+        for arg, names in unsupported.items():
+            kept = [name for name in _split(args[arg]) if name not in names]
+            if kept:
+                args[arg] = ", ".join(kept)
+            else:
+                del args[arg]
+        return args
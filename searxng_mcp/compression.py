@@ -0,0 +1,203 @@
+import zlib
+from collections.abc import Callable
+from typing import Any, Protocol
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+
+def available_encodings() -> list[str]:
+    "Content codings this process can decode and encode, most preferred first."
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def accept_encoding() -> str:
+    "Accept-Encoding header value asking SearXNG for the best coding available."
+    return ", ".join(available_encodings())
+
+
+def negotiate(header: str, encodings: list[str]) -> str | None:
+    "The first of `encodings` an Accept-Encoding `header` allows, if any."
+    weights = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if coding:
+            weights[coding.strip().lower()] = weight
+    default = weights.get("*", 0.0)
+    for encoding in encodings:
+        if weights.get(encoding, default) > 0:
+            return encoding
+    return None
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+    def flush(self) -> bytes: ...
+    def finish(self) -> bytes: ...
+
+
+class _Gzip:
+    def __init__(self):
+        self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self):
+        self._brotli = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data)
+
+    def flush(self) -> bytes:
+        return self._brotli.flush()
+
+    def finish(self) -> bytes:
+        return self._brotli.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._zstd = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zstd.compress(data)
+
+    def flush(self) -> bytes:
+        return self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def _compress(compressor: _Compressor, data: bytes, more: bool) -> bytes:
+    return compressor.compress(data) + (
+        compressor.flush() if more else compressor.finish()
+    )
+
+
+_COMPRESSORS: dict[str, Callable[[], _Compressor]] = {
+    "gzip": _Gzip,
+    "br": _Brotli,
+    "zstd": _Zstd,
+}
+
+_COMPRESSIBLE = ("text/", "application/json", "application/javascript")
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the best coding the client
+    accepts, of zstd, br and gzip.
+
+    Responses whose first body chunk is smaller than `minimum_size` are sent
+    as they are, so small ones and event streams starting with a ping skip
+    the CPU cost. Streamed responses are flushed after every chunk, so each
+    server-sent event still reaches the client as soon as it is sent.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = b", ".join(
+            v for k, v in scope["headers"] if k.lower() == b"accept-encoding"
+        )
+        encoding = negotiate(accepted.decode("latin-1"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: dict | None = None
+        compressor: _Compressor | None = None
+
+        async def compressing_send(message: dict) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first chunk shows whether to compress.
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = start.get("headers", [])
+                response_start, start = start, None
+                if not self._should_compress(headers, body):
+                    await send(response_start)
+                    await send(message)
+                    return
+                compressor = _COMPRESSORS[encoding]()
+                data = _compress(compressor, body, more_body)
+                headers = [
+                    (k, v)
+                    for k, v in headers
+                    if k.lower() not in (b"content-length", b"vary")
+                ]
+                vary = [v for k, v in response_start["headers"] if k.lower() == b"vary"]
+                headers += [
+                    (b"content-encoding", encoding.encode()),
+                    (b"vary", b", ".join([*vary, b"Accept-Encoding"])),
+                ]
+                if not more_body:
+                    headers.append((b"content-length", str(len(data)).encode()))
+                await send({**response_start, "headers": headers})
+                await send(
+                    {"type": "http.response.body", "body": data, "more_body": more_body}
+                )
+            elif compressor is not None:
+                data = _compress(compressor, body, more_body)
+                await send(
+                    {"type": "http.response.body", "body": data, "more_body": more_body}
+                )
+            else:
+                await send(message)
+
+        await self.app(scope, receive, compressing_send)
+
+    def _should_compress(self, headers: list[tuple[bytes, bytes]], body: bytes) -> bool:
+        if len(body) < self.minimum_size:
+            return False
+        content_type = b""
+        for key, value in headers:
+            key = key.lower()
+            if key == b"content-encoding":
+                return False
+            if key == b"content-type":
+                content_type = value.lower()
+        return content_type.decode("latin-1").startswith(_COMPRESSIBLE)
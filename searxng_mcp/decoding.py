@@ -0,0 +1,20 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def loads(body: bytes) -> Any:
+    "Decodes a json document straight from bytes, using orjson when installed."
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
@@ -0,0 +1,64 @@
+import time
+from typing import Any
+
+
+class EngineHealth:
+    """
+    Decaying failure score per SearXNG engine.
+
+    Every report of an engine in a response's `unresponsive_engines` (timeouts,
+    CAPTCHAs, access denied) adds one to its score and every response the
+    engine contributed results to takes one away. Scores halve every
+    `half_life` seconds. An engine reaching `threshold` is disabled for
+    `cool_down` seconds, after which it gets another chance.
+    """
+
+    def __init__(
+        self, half_life: float = 600.0, threshold: float = 3.0, cool_down: float = 300.0
+    ):
+        self.half_life = half_life
+        self.threshold = threshold
+        self.cool_down = cool_down
+        self._scores: dict[str, tuple[float, float]] = {}
+        self._disabled_until: dict[str, float] = {}
+
+    def _decayed(self, engine: str, now: float) -> float:
+        score, updated_at = self._scores.get(engine, (0.0, now))
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def score(self, engine: str) -> float:
+        return self._decayed(engine, time.monotonic())
+
+    def observe(self, document: Any) -> None:
+        "Updates the scores from a decoded SearXNG json response."
+        if not isinstance(document, dict):
+            return
+        now = time.monotonic()
+
+        for report in document.get("unresponsive_engines") or []:
+            # SearXNG reports `[name, reason]` pairs.
+            engine = report[0] if isinstance(report, (list, tuple)) else report
+            if not isinstance(engine, str):
+                continue
+            score = self._decayed(engine, now) + 1.0
+            self._scores[engine] = (score, now)
+            # Rounded so decay between back to back reports does not count.
+            if round(score, 3) >= self.threshold:
+                self._disabled_until[engine] = now + self.cool_down
+                self._scores[engine] = (0.0, now)
+
+        answered = set()
+        for result in document.get("results") or []:
+            if isinstance(result, dict):
+                answered.update(result.get("engines") or [result.get("engine")])
+        for engine in answered & self._scores.keys():
+            score = max(self._decayed(engine, now) - 1.0, 0.0)
+            self._scores[engine] = (score, now)
+
+    def disabled(self) -> list[str]:
+        "Engines currently cooling down."
+        now = time.monotonic()
+        for engine, until in list(self._disabled_until.items()):
+            if until <= now:
+                del self._disabled_until[engine]
+        return sorted(self._disabled_until)
@@ -0,0 +1,53 @@
+from collections import deque
+
+
+class Hedger:
+    """
+    Decides when a slow request gets a backup copy.
+
+    A request still unanswered after the `quantile` of recent latencies is
+    hedged with a second one. Every request earns `max_ratio` of a hedge, so
+    hedging adds at most that share of extra upstream requests, with bursts of
+    up to `burst` hedges.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.9,
+        max_ratio: float = 0.1,
+        window: int = 200,
+        min_samples: int = 20,
+        burst: float = 10.0,
+    ):
+        self.quantile = quantile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.burst = burst
+        self.hedges = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._threshold: float | None = None
+        self._unsorted = 0
+        self._tokens = 0.0
+
+    def observe(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._unsorted += 1
+
+    def delay(self) -> float | None:
+        "Seconds to wait before hedging a new request, None to not hedge it."
+        self._tokens = min(self._tokens + self.max_ratio, self.burst)
+        if not self._latencies or len(self._latencies) < self.min_samples:
+            return None
+        # Sorting the window on every request would cost more than it gains.
+        if self._threshold is None or self._unsorted >= 16:
+            ordered = sorted(self._latencies)
+            self._threshold = ordered[int(self.quantile * (len(ordered) - 1))]
+            self._unsorted = 0
+        return self._threshold
+
+    def can_hedge(self) -> bool:
+        return self._tokens >= 1
+
+    def spend(self) -> None:
+        self._tokens -= 1
+        self.hedges += 1
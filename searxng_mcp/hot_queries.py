@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class HotQueryTracker:
+    """
+    Exponentially decaying request counter per canonical query.
+
+    A query's score halves every `half_life` seconds without requests, so the
+    hottest queries follow current traffic. At most `capacity` queries are
+    tracked, making room by forgetting the coldest one.
+    """
+
+    def __init__(self, half_life: float = 300.0, capacity: int = 1000):
+        self.half_life = half_life
+        self.capacity = capacity
+        self._scores: dict[str, tuple[float, float]] = {}
+        self._args: dict[str, dict[str, Any]] = {}
+        self._fetched_at: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, key: str, now: float) -> float:
+        score, updated_at = self._scores.get(key, (0.0, now))
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def record(self, key: str, args: dict[str, Any]) -> None:
+        now = time.monotonic()
+        score = self._decayed(key, now)
+        if key not in self._scores and len(self._scores) >= self.capacity:
+            # Space saving: the newcomer replaces the coldest query and inherits
+            # its score, so a burst of new queries can still become hot.
+            coldest = min(self._scores, key=lambda k: self._decayed(k, now))
+            score = self._decayed(coldest, now)
+            self._forget(coldest)
+        self._scores[key] = (score + 1.0, now)
+        self._args[key] = args
+
+    def mark_fetched(self, key: str) -> None:
+        if key in self._scores:
+            self._fetched_at[key] = time.monotonic()
+
+    def age(self, key: str) -> float:
+        "Seconds since `key` was last fetched upstream, infinite if never."
+        fetched_at = self._fetched_at.get(key)
+        return float("inf") if fetched_at is None else time.monotonic() - fetched_at
+
+    def hottest(
+        self, limit: int, min_score: float = 1.5
+    ) -> list[tuple[str, dict[str, Any]]]:
+        "The `limit` best scored queries, skipping those requested only once."
+        now = time.monotonic()
+        scored = [(self._decayed(key, now), key) for key in self._scores]
+        scored = sorted((s for s in scored if s[0] >= min_score), reverse=True)
+        return [(key, self._args[key]) for _, key in scored[:limit]]
+
+    def _forget(self, key: str) -> None:
+        self._scores.pop(key, None)
+        self._args.pop(key, None)
+        self._fetched_at.pop(key, None)
+
+
+class RefreshScheduler:
+    """
+    Keeps the hottest queries fresh by refetching them in the background.
+
+    Every `max_age / 2` seconds (with jitter, so replicas do not refresh in
+    lockstep) the `max_queries` hottest queries older than half their
+    `max_age` are refreshed, spending at most `budget_per_minute` upstream
+    requests.
+    """
+
+    def __init__(
+        self,
+        tracker: HotQueryTracker,
+        refresh: Callable[[str, dict[str, Any]], Awaitable[Any]],
+        max_queries: int = 20,
+        max_age: float = 60.0,
+        budget_per_minute: float = 30.0,
+        jitter: float = 0.2,
+    ):
+        self.tracker = tracker
+        self.refresh = refresh
+        self.max_queries = max_queries
+        self.max_age = max_age
+        self.budget_per_minute = budget_per_minute
+        self.jitter = jitter
+        self.refreshes = 0
+        self._tokens = budget_per_minute
+        self._filled_at = time.monotonic()
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(
+            self.budget_per_minute,
+            self._tokens + (now - self._filled_at) * self.budget_per_minute / 60,
+        )
+        self._filled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def tick(self) -> None:
+        for key, args in self.tracker.hottest(self.max_queries):
+            if self.tracker.age(key) < self.max_age / 2:
+                continue
+            if not self._take_token():
+                return
+            try:
+                await self.refresh(key, args)
+                self.refreshes += 1
+            except Exception as e:
+                logger.warning(f"Refreshing hot query failed: {e}")
+
+    async def run(self) -> None:
+        interval = self.max_age / 2
+        while True:
+            spread = interval * self.jitter
+            await asyncio.sleep(interval + random.uniform(-spread, spread))
+            await self.tick()
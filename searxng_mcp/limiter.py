@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import deque
+
+
+class LimiterOverloaded(Exception):
+    "Raised when a call can not get a slot from an `AdaptiveLimiter`."
+
+
+class AdaptiveLimiter:
+    """
+    Caps concurrent calls with a limit that follows the upstream's capacity.
+
+    The limit grows by about one per round trip while latency stays within
+    `tolerance` times the lowest observed latency, and shrinks by
+    `backoff` at most once per round trip when latency climbs past that or a
+    call fails (AIMD). Calls over the limit wait in a queue of `queue_size`
+    for at most `queue_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        queue_size: int = 100,
+        queue_timeout: float = 5.0,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_use = 0
+        self.rejected = 0
+        self.baseline_latency = 0.0
+        self._decreased_at = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _has_room(self) -> bool:
+        return self.in_use < max(int(self.limit), self.min_limit)
+
+    def try_acquire(self) -> bool:
+        "Takes a slot only if one is free right away."
+        if self._has_room() and not self._waiters:
+            self.in_use += 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        if self.try_acquire():
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise LimiterOverloaded(f"{self.queue_size} calls are already waiting.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.rejected += 1
+            raise LimiterOverloaded(
+                f"No slot became free within {self.queue_timeout} seconds."
+            ) from None
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: "asyncio.Future[None]") -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was granted just as the caller gave up on it.
+            self.release()
+        elif waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+    def release(self, latency: float | None = None, ok: bool = True) -> None:
+        "Frees a slot, adapting the limit when the call's `latency` is known."
+        self.in_use -= 1
+        if latency is not None:
+            self._adapt(latency, ok)
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_use += 1
+                waiter.set_result(None)
+
+    def _adapt(self, latency: float, ok: bool) -> None:
+        if ok and (self.baseline_latency == 0.0 or latency < self.baseline_latency):
+            self.baseline_latency = latency
+        elif ok:
+            # Drift up slowly so the baseline recovers if the upstream's normal
+            # latency changes.
+            self.baseline_latency += 0.01 * (latency - self.baseline_latency)
+
+        congested = not ok or latency > self.baseline_latency * self.tolerance
+        if not congested:
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+            return
+        now = time.monotonic()
+        if now - self._decreased_at >= latency:
+            self._decreased_at = now
+            self.limit = max(self.limit * self.backoff, self.min_limit)
@@ -1,10 +1,17 @@
+import logging
 import os
+import tempfile
 from enum import Enum
 from functools import partial
+from typing import Any
 
 import anyio
+import fastmcp
 import typer
+from fastmcp import FastMCP
+from searxng_client import SearxngClient
 from server import create_mcp_server
+from tracing import opentelemetry_tracer
 
 
 class HTTPTransportTypes(Enum):
@@ -13,16 +20,198 @@ class HTTPTransportTypes(Enum):
     sse = "sse"
 
 
+def env_flag(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_float_mapping(name: str) -> dict[str, float]:
+    "Parses `key=value,key=value` pairs, e.g. `json=300,html=60`."
+    mapping = {}
+    for pair in os.environ.get(name, "").split(","):
+        if "=" in pair:
+            key, value = pair.split("=", 1)
+            mapping[key.strip()] = float(value)
+    return mapping
+
+
+def create_searxng_client() -> SearxngClient:
+    return SearxngClient(
+        os.environ.get("SEARXNG_URL", "http://host.docker.internal:8181"),
+        max_connections=int(os.environ.get("SEARXNG_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(
+            os.environ.get("SEARXNG_MAX_KEEPALIVE_CONNECTIONS", "20")
+        ),
+        keepalive_expiry=float(os.environ.get("SEARXNG_KEEPALIVE_EXPIRY", "30")),
+        http2=env_flag("SEARXNG_HTTP2"),
+        timeout=float(os.environ.get("SEARXNG_TIMEOUT", "10")),
+        connect_timeout=float(os.environ.get("SEARXNG_CONNECT_TIMEOUT", "5")),
+        read_timeout=(
+            float(os.environ["SEARXNG_READ_TIMEOUT"])
+            if "SEARXNG_READ_TIMEOUT" in os.environ
+            else None
+        ),
+        # 0 lets a search take as long as its retries need.
+        total_timeout=float(os.environ.get("SEARXNG_TOTAL_TIMEOUT", "30")) or None,
+        retries=int(os.environ.get("SEARXNG_RETRIES", "2")),
+        retry_backoff=float(os.environ.get("SEARXNG_RETRY_BACKOFF", "0.1")),
+        retry_backoff_max=float(os.environ.get("SEARXNG_RETRY_BACKOFF_MAX", "2")),
+        breaker_failures=int(os.environ.get("SEARXNG_BREAKER_FAILURES", "5")),
+        breaker_reset=float(os.environ.get("SEARXNG_BREAKER_RESET", "30")),
+        hedge_quantile=(
+            float(os.environ["SEARXNG_HEDGE_QUANTILE"])
+            if "SEARXNG_HEDGE_QUANTILE" in os.environ
+            else None
+        ),
+        hedge_max_ratio=float(os.environ.get("SEARXNG_HEDGE_MAX_RATIO", "0.1")),
+        cache_max_entries=int(os.environ.get("SEARXNG_CACHE_MAX_ENTRIES", "1024")),
+        cache_max_bytes=int(
+            os.environ.get("SEARXNG_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+        ),
+        cache_ttl=float(os.environ.get("SEARXNG_CACHE_TTL", "300")),
+        cache_ttls=env_float_mapping("SEARXNG_CACHE_TTLS"),
+        balancing_strategy=os.environ.get("SEARXNG_BALANCING", "least_outstanding"),
+        max_backend_failures=int(os.environ.get("SEARXNG_MAX_FAILURES", "3")),
+        probe_interval=float(os.environ.get("SEARXNG_PROBE_INTERVAL", "10")),
+        failover_attempts=int(os.environ.get("SEARXNG_FAILOVER_ATTEMPTS", "3")),
+        batch_concurrency=int(os.environ.get("SEARXNG_BATCH_CONCURRENCY", "8")),
+        batch_max_queries=int(os.environ.get("SEARXNG_BATCH_MAX_QUERIES", "20")),
+        page_concurrency=int(os.environ.get("SEARXNG_PAGE_CONCURRENCY", "5")),
+        max_pages=int(os.environ.get("SEARXNG_MAX_PAGES", "10")),
+        result_max_bytes=(
+            int(os.environ["SEARXNG_RESULT_MAX_BYTES"])
+            if "SEARXNG_RESULT_MAX_BYTES" in os.environ
+            else None
+        ),
+        max_response_bytes=int(
+            os.environ.get("SEARXNG_MAX_RESPONSE_BYTES", str(8 * 1024 * 1024))
+        ),
+        thread_decode_bytes=int(
+            os.environ.get("SEARXNG_THREAD_DECODE_BYTES", str(256 * 1024))
+        ),
+        persistent_cache_path=os.environ.get("SEARXNG_PERSISTENT_CACHE") or None,
+        persistent_cache_stale_ttl=float(
+            os.environ.get("SEARXNG_PERSISTENT_CACHE_STALE_TTL", "3600")
+        ),
+        persistent_cache_max_entries=int(
+            os.environ.get("SEARXNG_PERSISTENT_CACHE_MAX_ENTRIES", "100000")
+        ),
+        autocomplete_cache_entries=int(
+            os.environ.get("SEARXNG_AUTOCOMPLETE_CACHE_ENTRIES", "10000")
+        ),
+        autocomplete_cache_ttl=float(
+            os.environ.get("SEARXNG_AUTOCOMPLETE_CACHE_TTL", "600")
+        ),
+        fetch_max_connections=int(
+            os.environ.get("SEARXNG_FETCH_MAX_CONNECTIONS", "20")
+        ),
+        fetch_max_per_host=int(os.environ.get("SEARXNG_FETCH_MAX_PER_HOST", "2")),
+        fetch_max_bytes=int(os.environ.get("SEARXNG_FETCH_MAX_BYTES", "2097152")),
+        fetch_timeout=float(os.environ.get("SEARXNG_FETCH_TIMEOUT", "10")),
+        fetch_cache_entries=int(os.environ.get("SEARXNG_FETCH_CACHE_ENTRIES", "256")),
+        fetch_max_pages=int(os.environ.get("SEARXNG_FETCH_MAX_PAGES", "10")),
+        fetch_private_networks=env_flag("SEARXNG_FETCH_PRIVATE_NETWORKS"),
+        hot_queries=int(os.environ.get("SEARXNG_HOT_QUERIES", "0")),
+        hot_query_max_age=float(os.environ.get("SEARXNG_HOT_QUERY_MAX_AGE", "60")),
+        hot_query_half_life=float(os.environ.get("SEARXNG_HOT_QUERY_HALF_LIFE", "300")),
+        hot_refresh_budget=float(os.environ.get("SEARXNG_HOT_REFRESH_BUDGET", "30")),
+        concurrency_limit=int(os.environ.get("SEARXNG_CONCURRENCY_LIMIT", "20")),
+        max_concurrency=int(os.environ.get("SEARXNG_MAX_CONCURRENCY", "100")),
+        queue_size=int(os.environ.get("SEARXNG_QUEUE_SIZE", "100")),
+        queue_timeout=float(os.environ.get("SEARXNG_QUEUE_TIMEOUT", "5")),
+        tracer=(
+            opentelemetry_tracer()
+            if os.environ.get("SEARXNG_TRACER") == "opentelemetry"
+            else None
+        ),
+        trace_sample_rate=float(os.environ.get("SEARXNG_TRACE_SAMPLE_RATE", "0")),
+        engine_cool_down=float(os.environ.get("SEARXNG_ENGINE_COOL_DOWN", "300")),
+        engine_failure_threshold=float(
+            os.environ.get("SEARXNG_ENGINE_FAILURE_THRESHOLD", "3")
+        ),
+        engine_health_half_life=float(
+            os.environ.get("SEARXNG_ENGINE_HEALTH_HALF_LIFE", "600")
+        ),
+        capabilities_refresh=float(
+            os.environ.get("SEARXNG_CAPABILITIES_REFRESH", "3600")
+        ),
+        unsupported_policy=os.environ.get("SEARXNG_UNSUPPORTED", "strip"),
+    )
+
+
+def create_server() -> tuple[SearxngClient, FastMCP]:
+    searxng_client = create_searxng_client()
+    return searxng_client, create_mcp_server(searxng_client)
+
+
+def http_middleware() -> list[Any]:
+    "ASGI middleware of the http transport."
+    # Only needed by the http transport.
+    from compression import CompressionMiddleware
+    from starlette.middleware import Middleware
+
+    if not env_flag("SEARXNG_COMPRESSION", default=True):
+        return []
+    minimum_size = int(os.environ.get("SEARXNG_COMPRESSION_MIN_BYTES", "1024"))
+    return [Middleware(CompressionMiddleware, minimum_size=minimum_size)]
+
+
+def serve_workers(
+    workers: int,
+    *,
+    transport: HTTPTransportTypes,
+    host: str | None,
+    port: int | None,
+    log_level: str | None,
+    path: str,
+    stateless_http: bool | None,
+    graceful_timeout: float,
+    shared_cache: bool,
+) -> None:
+    from workers import Supervisor, WorkerOptions
+
+    if transport is HTTPTransportTypes.sse:
+        raise typer.BadParameter(
+            "SSE sessions cannot be routed between workers.", param_hint="--workers"
+        )
+    log_level = (log_level or fastmcp.settings.log_level).lower()
+    logging.basicConfig(level=log_level.upper(), format="%(levelname)s: %(message)s")
+
+    with tempfile.TemporaryDirectory(prefix="searxng-mcp-") as cache_dir:
+        if shared_cache and not os.environ.get("SEARXNG_PERSISTENT_CACHE"):
+            # Inherited by the workers, which then share one SQLite cache.
+            os.environ["SEARXNG_PERSISTENT_CACHE"] = f"{cache_dir}/results.sqlite3"
+        options = WorkerOptions(
+            create_server=create_server,
+            transport=transport.value,
+            path=f"/{path}",
+            log_level=log_level,
+            stateless_http=bool(
+                stateless_http
+                if stateless_http is not None
+                else fastmcp.settings.stateless_http
+            ),
+            graceful_timeout=graceful_timeout,
+            middleware=http_middleware(),
+        )
+        Supervisor(
+            options,
+            workers,
+            host=host or fastmcp.settings.host,
+            port=port or fastmcp.settings.port,
+        ).run()
+
+
 def main():
-    api_url = os.environ.get("SEARXNG_URL", "http://host.docker.internal:8181")
     default_path = os.environ.get("DEFAULT_PATH", "mcp")
 
-    mcp = create_mcp_server(api_url)
-
     app = typer.Typer()
 
     @app.command()
     def stdio(show_banner: bool = True):
+        _, mcp = create_server()
         anyio.run(
             partial(
                 mcp.run_stdio_async,
@@ -39,19 +228,43 @@ def main():
         log_level: str | None = None,
         path: str | None = None,
         stateless_http: bool | None = None,
+        workers: int = 1,
+        graceful_timeout: float = 10.0,
+        shared_cache: bool = False,
     ):
-        anyio.run(
-            partial(
-                mcp.run_http_async,
-                show_banner=show_banner,
-                transport=transport.value,
+        if workers > 1:
+            serve_workers(
+                workers,
+                transport=transport,
                 host=host,
                 port=port,
                 log_level=log_level,
-                path=f"/{path if path is not None else default_path}",
+                path=path if path is not None else default_path,
                 stateless_http=stateless_http,
+                graceful_timeout=graceful_timeout,
+                shared_cache=shared_cache,
             )
-        )
+            return
+
+        searxng_client, mcp = create_server()
+        middleware = http_middleware()
+
+        async def serve():
+            # Every http session enters the server lifespan; holding the client
+            # open for the whole process keeps the pool warm between sessions.
+            async with searxng_client:
+                await mcp.run_http_async(
+                    show_banner=show_banner,
+                    transport=transport.value,
+                    host=host,
+                    port=port,
+                    log_level=log_level,
+                    path=f"/{path if path is not None else default_path}",
+                    stateless_http=stateless_http,
+                    middleware=middleware,
+                )
+
+        anyio.run(serve)
 
     app()
 
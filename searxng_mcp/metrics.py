@@ -0,0 +1,357 @@
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Collection, Iterable, Sequence
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+Labels = tuple[str, ...]
+Sample = tuple[dict[str, str], float]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    "Monotonic count per label combination."
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[tuple[str, dict[str, str], float]]:
+        for label_values, value in self.values.items():
+            yield self.name, dict(zip(self.labels, label_values)), value
+
+
+class Gauge(Counter):
+    "Value that can go up and down."
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    "Distribution of observed values over fixed `buckets`."
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per label combination: count per bucket (the last one is +Inf), sum.
+        self.values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        entry = self.values.get(label_values)
+        if entry is None:
+            entry = self.values[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def samples(self) -> Iterable[tuple[str, dict[str, str], float]]:
+        for label_values, (counts, total) in self.values.items():
+            labels = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield f"{self.name}_bucket", {**labels, "le": le}, cumulative
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Collected:
+    "Metric whose samples are read from elsewhere when it is rendered."
+
+    def __init__(
+        self, name: str, kind: str, help: str, collect: Callable[[], Iterable[Sample]]
+    ):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.collect = collect
+
+    def samples(self) -> Iterable[tuple[str, dict[str, str], float]]:
+        for labels, value in self.collect():
+            yield self.name, labels, value
+
+
+class Registry:
+    "Metrics rendered together in the Prometheus text format."
+
+    def __init__(self):
+        self.metrics: list[Any] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def collected(
+        self, name: str, kind: str, help: str, collect: Callable[[], Iterable[Sample]]
+    ) -> Collected:
+        return self._add(Collected(name, kind, help, collect))
+
+    def _add(self, metric: Any) -> Any:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class SearchMetrics:
+    "Everything measured on the search path, in one registry."
+
+    def __init__(self):
+        self.registry = registry = Registry()
+        self.tool_calls = registry.counter(
+            "searxng_mcp_tool_calls_total",
+            "Tool calls by tool, format, category and outcome.",
+            ("tool", "format", "category", "status"),
+        )
+        self.tool_latency = registry.histogram(
+            "searxng_mcp_tool_call_seconds",
+            "Tool call latency by tool, format and category.",
+            ("tool", "format", "category"),
+        )
+        self.tool_calls_in_flight = registry.gauge(
+            "searxng_mcp_tool_calls_in_flight", "Tool calls being processed."
+        )
+        self.upstream_responses = registry.counter(
+            "searxng_mcp_upstream_responses_total",
+            "SearXNG responses by status code, `error` for connection failures.",
+            ("status",),
+        )
+        self.upstream_latency = registry.histogram(
+            "searxng_mcp_upstream_request_seconds", "SearXNG request latency."
+        )
+        self.upstream_bytes = registry.counter(
+            "searxng_mcp_upstream_received_bytes_total",
+            "Response body bytes received from SearXNG, after decompression.",
+        )
+        self.upstream_wire_bytes = registry.counter(
+            "searxng_mcp_upstream_wire_bytes_total",
+            "Response body bytes received from SearXNG as sent, compressed.",
+        )
+        self.decode_latency = registry.histogram(
+            "searxng_mcp_decode_seconds",
+            "Time spent decoding SearXNG responses.",
+            buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+        )
+
+    def watch(self, client: Any) -> None:
+        "Reports the state of a `SearxngClient` whenever metrics are rendered."
+        registry = self.registry
+        registry.collected(
+            "searxng_mcp_upstream_requests_in_flight",
+            "gauge",
+            "SearXNG requests in flight.",
+            lambda: [({}, client.limiter.in_use)],
+        )
+        registry.collected(
+            "searxng_mcp_upstream_requests_queued",
+            "gauge",
+            "Searches waiting for a free SearXNG request slot.",
+            lambda: [({}, client.limiter.queued)],
+        )
+        registry.collected(
+            "searxng_mcp_upstream_concurrency_limit",
+            "gauge",
+            "Current adaptive limit of concurrent SearXNG requests.",
+            lambda: [({}, int(client.limiter.limit))],
+        )
+        registry.collected(
+            "searxng_mcp_pool_connections",
+            "gauge",
+            "Pooled connections to SearXNG by state.",
+            lambda: _pool_connections(client._http_client),
+        )
+        registry.collected(
+            "searxng_mcp_circuit_open",
+            "gauge",
+            "1 while searches fail fast because SearXNG is down.",
+            lambda: [({}, int(client.breaker.state == "open"))],
+        )
+        registry.collected(
+            "searxng_mcp_cache_events_total",
+            "counter",
+            "Result cache lookups and evictions by cache and event.",
+            lambda: _cache_events(
+                client.cache, client.persistent_cache, client.suggestions
+            ),
+        )
+        registry.collected(
+            "searxng_mcp_cache_entries",
+            "gauge",
+            "Results held by the in-memory cache.",
+            lambda: [({}, len(client.cache))],
+        )
+        registry.collected(
+            "searxng_mcp_cache_bytes",
+            "gauge",
+            "Approximate size of the in-memory cache.",
+            lambda: [({}, client.cache.size_bytes)],
+        )
+        registry.collected(
+            "searxng_mcp_page_fetches_total",
+            "counter",
+            "Pages fetched by search_and_fetch by result.",
+            lambda: [
+                ({"result": "fetched"}, client.page_fetcher.fetched),
+                ({"result": "not_modified"}, client.page_fetcher.not_modified),
+                ({"result": "failed"}, client.page_fetcher.failed),
+            ],
+        )
+        if client.engine_health is not None:
+            registry.collected(
+                "searxng_mcp_engines_disabled",
+                "gauge",
+                "Engines disabled for failing repeatedly.",
+                lambda: [({}, len(client.engine_health.disabled()))],
+            )
+        if client.hedger is not None:
+            registry.collected(
+                "searxng_mcp_hedged_requests_total",
+                "counter",
+                "Backup requests sent for slow SearXNG requests.",
+                lambda: [({}, client.hedger.hedges)],
+            )
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+def _pool_connections(http_client: Any) -> list[Sample]:
+    # httpx does not expose its pool, so this reads httpcore's when present.
+    transport = getattr(http_client, "_transport", None)
+    connections = getattr(getattr(transport, "_pool", None), "connections", [])
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return [({"state": "active"}, len(connections) - idle), ({"state": "idle"}, idle)]
+
+
+def _cache_events(memory: Any, persistent: Any, suggestions: Any) -> list[Sample]:
+    samples = [
+        ({"cache": "memory", "event": "hit"}, memory.hits),
+        ({"cache": "memory", "event": "miss"}, memory.misses),
+        ({"cache": "memory", "event": "eviction"}, memory.evictions),
+        ({"cache": "autocomplete", "event": "hit"}, suggestions.hits),
+        ({"cache": "autocomplete", "event": "prefix_hit"}, suggestions.derived_hits),
+        ({"cache": "autocomplete", "event": "miss"}, suggestions.misses),
+        ({"cache": "autocomplete", "event": "eviction"}, suggestions.evictions),
+    ]
+    if persistent is not None:
+        samples += [
+            ({"cache": "persistent", "event": "hit"}, persistent.hits),
+            ({"cache": "persistent", "event": "stale_hit"}, persistent.stale_hits),
+            ({"cache": "persistent", "event": "miss"}, persistent.misses),
+        ]
+    return samples
+
+
+def _label(value: Any, known: Collection[str]) -> str:
+    # Client input must not create time series of its own.
+    value = str(value).strip()
+    return value if value in known else "other"
+
+
+def _category_label(categories: Any, known: Collection[str]) -> str:
+    # Every combination of categories would make its own time series.
+    if not categories:
+        return "none"
+    if isinstance(categories, str):
+        categories = categories.split(",")
+    return _label(categories[0], known) if len(categories) == 1 else "mixed"
+
+
+class ToolMetricsMiddleware(Middleware):
+    """
+    Counts and times every tool call, by tool, format and category. Values
+    outside `tools`, `formats` and `categories` are counted as `other`.
+    """
+
+    def __init__(
+        self,
+        metrics: SearchMetrics,
+        tools: Collection[str],
+        formats: Collection[str],
+        categories: Collection[str],
+    ):
+        self.metrics = metrics
+        self.tools = frozenset(tools)
+        self.formats = frozenset(formats)
+        self.categories = frozenset(categories)
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, mt.CallToolResult],
+    ) -> mt.CallToolResult:
+        arguments = context.message.arguments or {}
+        labels = (
+            _label(context.message.name, self.tools),
+            _label(arguments.get("format") or "json", self.formats),
+            _category_label(arguments.get("categories"), self.categories),
+        )
+        metrics = self.metrics
+        metrics.tool_calls_in_flight.inc()
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = await call_next(context)
+            status = "error" if getattr(result, "isError", False) else "ok"
+            return result
+        finally:
+            metrics.tool_calls_in_flight.dec()
+            metrics.tool_latency.observe(time.perf_counter() - started, *labels)
+            metrics.tool_calls.inc(*labels, status)
@@ -0,0 +1,415 @@
+import asyncio
+import ipaddress
+import re
+import socket
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from html.parser import HTMLParser
+from typing import Any, NamedTuple
+
+import httpcore
+import httpx
+
+# Elements whose text is never part of the readable content.
+_SKIPPED = frozenset(
+    {
+        "aside",
+        "button",
+        "canvas",
+        "footer",
+        "form",
+        "head",
+        "header",
+        "iframe",
+        "nav",
+        "noscript",
+        "script",
+        "select",
+        "style",
+        "svg",
+        "template",
+    }
+)
+# Elements that start a new line of text.
+_BLOCKS = frozenset(
+    {
+        "article",
+        "blockquote",
+        "br",
+        "dd",
+        "div",
+        "dt",
+        "figcaption",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "hr",
+        "li",
+        "main",
+        "ol",
+        "p",
+        "pre",
+        "section",
+        "table",
+        "td",
+        "th",
+        "tr",
+        "ul",
+    }
+)
+# Elements holding the main content when a page marks it.
+_MAIN = frozenset({"article", "main"})
+_VOID = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "wbr"}
+)
+_TEXT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title: list[str] = []
+        self.text: list[str] = []
+        self.main_text: list[str] = []
+        self._skipping: list[str] = []
+        self._main_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag == "title":
+            self._in_title = True
+        if tag in _VOID:
+            if tag in _BLOCKS:
+                self._add("\n")
+            return
+        if tag in _SKIPPED:
+            self._skipping.append(tag)
+        elif tag in _MAIN:
+            self._main_depth += 1
+        if tag in _BLOCKS:
+            self._add("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        if tag in self._skipping:
+            # Tolerates unclosed elements nested in the skipped one.
+            while self._skipping.pop() != tag:
+                pass
+        elif tag in _MAIN and self._main_depth:
+            self._main_depth -= 1
+        if tag in _BLOCKS:
+            self._add("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title.append(data)
+        else:
+            self._add(data)
+
+    def _add(self, text: str) -> None:
+        if self._skipping:
+            return
+        self.text.append(text)
+        if self._main_depth:
+            self.main_text.append(text)
+
+
+def _tidy(chunks: list[str]) -> str:
+    lines = (_WHITESPACE.sub(" ", line).strip() for line in "".join(chunks).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def extract_text(html: str) -> tuple[str, str]:
+    """
+    Title and readable text of an html page.
+
+    Scripts, navigation, headers, footers and forms are dropped. When the page
+    marks its main content with `<main>` or `<article>` and that holds most of
+    the remaining text, only it is kept.
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    text = _tidy(parser.text)
+    main = _tidy(parser.main_text)
+    if len(main) >= len(text) / 3:
+        text = main
+    return _tidy(parser.title), text
+
+
+class PageError(Exception):
+    pass
+
+
+class _CachedPage(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    page: dict[str, Any]
+    size: int
+
+
+class PageCache:
+    """
+    Extracted pages by URL with the validators they were served with, so a
+    repeated fetch is a conditional request answered by 304 Not Modified.
+    Pages without an ETag or Last-Modified are not kept. Least recently used
+    pages are dropped beyond `max_entries` or `max_bytes` of text.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _CachedPage] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> _CachedPage | None:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def set(self, url: str, response: httpx.Response, page: dict[str, Any]) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        size = len(page.get("text", ""))
+        if (etag is None and last_modified is None) or size > self.max_bytes:
+            return
+        self._discard(url)
+        self._entries[url] = _CachedPage(etag, last_modified, page, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+class _PinnedBackend(httpcore.AsyncNetworkBackend):
+    """
+    Connects to the address a host was checked to have in `addresses`
+    instead of resolving it again, which could give another one. The url
+    keeps the host name, so pooled connections, certificates and cookies
+    stay per host.
+    """
+
+    def __init__(
+        self, backend: httpcore.AsyncNetworkBackend, addresses: dict[str, str]
+    ):
+        self.backend = backend
+        self.addresses = addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        address = self.addresses.get(host)
+        if address is None:
+            raise httpcore.ConnectError(f"No checked address for {host}.")
+        return await self.backend.connect_tcp(
+            address, port, timeout, local_address, socket_options
+        )
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        raise httpcore.ConnectError("Pages are not fetched over unix sockets.")
+
+    async def sleep(self, seconds: float) -> None:
+        await self.backend.sleep(seconds)
+
+
+class PageFetcher:
+    """
+    Fetches web pages concurrently and extracts their text.
+
+    At most `max_connections` pages are fetched at once and `max_per_host`
+    requests go to one host, redirects included. Each page gets `timeout`
+    seconds including waiting for a slot, and only its first `max_bytes` are
+    read. Addresses that are not public, like loopback or private networks,
+    are refused unless `allow_private_networks` is set, also when redirected
+    to, and connections go to the very address that was checked.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_per_host: int = 2,
+        max_bytes: int = 2 * 1024 * 1024,
+        timeout: float = 10.0,
+        max_redirects: int = 5,
+        cache: PageCache | None = None,
+        allow_private_networks: bool = False,
+        thread_extract_bytes: int = 256 * 1024,
+    ):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.cache = cache if cache is not None else PageCache()
+        self.allow_private_networks = allow_private_networks
+        self.thread_extract_bytes = thread_extract_bytes
+        self.fetched = 0
+        self.not_modified = 0
+        self.failed = 0
+        self._slots = asyncio.Semaphore(max_connections)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._host_users: dict[str, int] = {}
+        # The checked address of each host being fetched, to connect to.
+        self._addresses: dict[str, str] = {}
+        self._http_client: httpx.AsyncClient | None = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=self.max_connections)
+            )
+            # httpx has no option for the network backend of its pool.
+            pool = transport._pool
+            pool._network_backend = _PinnedBackend(
+                pool._network_backend, self._addresses
+            )
+            self._http_client = httpx.AsyncClient(
+                transport=transport,
+                timeout=self.timeout,
+                headers={"User-Agent": "searxng-mcp (+page fetch)"},
+            )
+        return self._http_client
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def fetch(self, url: str) -> dict[str, Any]:
+        "The page's `url`, `title`, `text` and whether it was `truncated`, or `error`."
+        try:
+            async with asyncio.timeout(self.timeout), self._slots:
+                return await self._fetch(url)
+        except TimeoutError:
+            error = f"Timed out after {self.timeout} seconds."
+        except (PageError, httpx.HTTPError) as e:
+            error = str(e) or type(e).__name__
+        except Exception as e:
+            # One odd page must not fail the pages fetched alongside it.
+            error = f"{type(e).__name__}: {e}"
+        self.failed += 1
+        return {"url": url, "error": error}
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str) -> AsyncIterator[None]:
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        slot = self._host_slots.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        try:
+            async with slot:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host], self._host_slots[host]
+                self._addresses.pop(host, None)
+
+    async def _fetch(self, url: str) -> dict[str, Any]:
+        client = self._get_http_client()
+        for _ in range(self.max_redirects + 1):
+            target = httpx.URL(url)
+            # Every hop counts against the limit of the host it goes to.
+            host = target.raw_host.decode("ascii")
+            async with self._host_slot(host):
+                self._addresses[host] = await self._check_url(target)
+                cached = self.cache.get(url)
+                headers = {}
+                if cached is not None:
+                    if cached.etag is not None:
+                        headers["If-None-Match"] = cached.etag
+                    if cached.last_modified is not None:
+                        headers["If-Modified-Since"] = cached.last_modified
+                request = client.build_request("GET", target, headers=headers)
+                response = await client.send(request, stream=True)
+                try:
+                    if response.status_code == 304 and cached is not None:
+                        self.not_modified += 1
+                        return cached.page
+                    if response.has_redirect_location:
+                        location = response.headers["Location"]
+                        url = str(httpx.URL(url).join(location))
+                        continue
+                    response.raise_for_status()
+                    page = await self._read(url, response)
+                finally:
+                    await response.aclose()
+            self.fetched += 1
+            self.cache.set(url, response, page)
+            return page
+        raise PageError(f"More than {self.max_redirects} redirects.")
+
+    async def _read(self, url: str, response: httpx.Response) -> dict[str, Any]:
+        content_type = response.headers.get("Content-Type", "text/html").lower()
+        if not content_type.startswith(_TEXT_TYPES):
+            raise PageError(f"Not a text page: {content_type}.")
+
+        body = bytearray()
+        truncated = False
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) >= self.max_bytes:
+                truncated = (
+                    len(body) > self.max_bytes or not response.is_stream_consumed
+                )
+                del body[self.max_bytes :]
+                break
+        try:
+            text = body.decode(response.charset_encoding or "utf-8", "replace")
+        except LookupError:
+            text = body.decode("utf-8", "replace")
+
+        if content_type.startswith("text/plain"):
+            title, text = "", _tidy([text])
+        elif len(body) >= self.thread_extract_bytes:
+            title, text = await asyncio.to_thread(extract_text, text)
+        else:
+            title, text = extract_text(text)
+        return {
+            "url": url,
+            "title": title,
+            "text": text,
+            "truncated": truncated,
+        }
+
+    async def _check_url(self, url: httpx.URL) -> str:
+        "The public address to connect to for `url`, or its host when not checked."
+        if url.scheme not in ("http", "https") or not url.host:
+            raise PageError(f"Not an http url: {url}")
+        if self.allow_private_networks:
+            return url.raw_host.decode("ascii")
+        try:
+            addresses = [ipaddress.ip_address(url.host)]
+        except ValueError:
+            try:
+                infos = await asyncio.get_running_loop().getaddrinfo(
+                    url.host, url.port, type=socket.SOCK_STREAM
+                )
+            except OSError as e:
+                raise PageError(f"Cannot resolve {url.host}: {e}") from None
+            addresses = [ipaddress.ip_address(info[4][0]) for info in infos]
+        if not addresses or not all(address.is_global for address in addresses):
+            raise PageError(f"Refusing to fetch a non public address: {url}")
+        return str(addresses[0])
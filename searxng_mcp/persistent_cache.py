@@ -0,0 +1,131 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from decoding import dumps, loads
+
+
+class PersistentEntry(NamedTuple):
+    document: Any
+    size: int
+    stale: bool
+    ttl: float
+
+
+class PersistentCache:
+    """
+    Result cache shared between processes and kept across restarts.
+
+    Documents are stored zlib compressed in an SQLite database in WAL mode, so
+    several server processes can use one file on a shared volume. An entry is
+    fresh until its TTL runs out and may then be served stale for another
+    `stale_ttl` seconds while it is being refreshed.
+    """
+
+    _PURGE_EVERY = 256
+
+    def __init__(
+        self,
+        path: str | Path,
+        stale_ttl: float = 3600.0,
+        max_entries: int = 100_000,
+        compression_level: int = 6,
+    ):
+        self.path = Path(path)
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.compression_level = compression_level
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self._db: sqlite3.Connection | None = None
+        with self._lock:
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        "The open connection, reopened after `close`. Called with the lock held."
+        if self._db is not None:
+            return self._db
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            self.path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL
+            )
+            """
+        )
+        return self._db
+
+    async def get(self, key: str) -> PersistentEntry | None:
+        return await asyncio.to_thread(self.get_sync, key)
+
+    async def set(self, key: str, document: Any, ttl: float) -> None:
+        await asyncio.to_thread(self.set_sync, key, document, ttl)
+
+    def get_sync(self, key: str) -> PersistentEntry | None:
+        with self._lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT value, expires_at, stale_until FROM results WHERE key = ?",
+                (key,),
+            ).fetchone()
+        now = time.time()
+        if row is None or row[2] <= now:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = row
+        stale = expires_at <= now
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        raw = zlib.decompress(value)
+        return PersistentEntry(loads(raw), len(raw), stale, max(expires_at - now, 0.0))
+
+    def set_sync(self, key: str, document: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        value = zlib.compress(dumps(document), self.compression_level)
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now + ttl + self.stale_ttl),
+            )
+            self._writes += 1
+            if self._writes % self._PURGE_EVERY == 0:
+                self._purge(db, now)
+
+    def _purge(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM results WHERE stale_until <= ?", (now,))
+        db.execute(
+            """
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,133 @@
+import csv
+import io
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from email.utils import format_datetime
+from html import escape
+from typing import Any
+
+# Column order of SearXNG's own csv output.
+_CSV_COLUMNS = ("title", "url", "content", "host", "engine", "score", "type")
+
+
+def _results(document: dict[str, Any]) -> list[dict[str, Any]]:
+    results = document.get("results")
+    return (
+        [r for r in results if isinstance(r, dict)] if isinstance(results, list) else []
+    )
+
+
+def _host(url: str) -> str:
+    return url.split("://", 1)[-1].split("/", 1)[0]
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def render_csv(document: dict[str, Any]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def row(values: list[Any]) -> str:
+        writer.writerow(values)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    yield row(list(_CSV_COLUMNS))
+    for result in _results(document):
+        url = _text(result.get("url"))
+        yield row(
+            [
+                _text(result.get("title")),
+                url,
+                _text(result.get("content")),
+                _host(url),
+                ", ".join(result.get("engines") or [_text(result.get("engine"))]),
+                _text(result.get("score")),
+                "result",
+            ]
+        )
+    for kind, field in (
+        ("answer", "answers"),
+        ("suggestion", "suggestions"),
+        ("correction", "corrections"),
+    ):
+        for item in document.get(field) or []:
+            text = item.get("answer", "") if isinstance(item, dict) else item
+            yield row([_text(text), "", "", "", "", "", kind])
+
+
+def _rfc822(value: Any) -> str | None:
+    try:
+        return format_datetime(datetime.fromisoformat(str(value)))
+    except ValueError:
+        return None
+
+
+def render_rss(document: dict[str, Any]) -> Iterator[str]:
+    query = escape(_text(document.get("query")))
+    results = _results(document)
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield (
+        '<rss version="2.0" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"'
+        ' xmlns:atom="http://www.w3.org/2005/Atom">\n  <channel>\n'
+    )
+    yield f"    <title>SearXNG search: {query}</title>\n"
+    yield f'    <description>Search results for "{query}" - SearXNG</description>\n'
+    total = document.get("number_of_results") or len(results)
+    yield f"    <opensearch:totalResults>{int(total)}</opensearch:totalResults>\n"
+    yield "    <opensearch:startIndex>1</opensearch:startIndex>\n"
+    yield f"    <opensearch:itemsPerPage>{len(results)}</opensearch:itemsPerPage>\n"
+    for result in results:
+        yield "    <item>\n"
+        yield f"      <title>{escape(_text(result.get('title')))}</title>\n"
+        yield f"      <link>{escape(_text(result.get('url')))}</link>\n"
+        content = escape(_text(result.get("content")))
+        yield f"      <description>{content}</description>\n"
+        published = result.get("publishedDate") and _rfc822(result["publishedDate"])
+        if published:
+            yield f"      <pubDate>{published}</pubDate>\n"
+        yield "    </item>\n"
+    yield "  </channel>\n</rss>\n"
+
+
+def render_html(document: dict[str, Any]) -> Iterator[str]:
+    query = escape(_text(document.get("query")))
+    yield '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+    yield f"<title>{query} - SearXNG</title></head><body>\n"
+    for answer in document.get("answers") or []:
+        text = answer.get("answer", "") if isinstance(answer, dict) else answer
+        yield f'<div class="answer">{escape(_text(text))}</div>\n'
+    yield '<main id="results">\n'
+    for result in _results(document):
+        url = escape(_text(result.get("url")))
+        yield '<article class="result">'
+        yield f'<h3><a href="{url}">{escape(_text(result.get("title")))}</a></h3>'
+        yield f'<p class="content">{escape(_text(result.get("content")))}</p>'
+        yield f'<div class="url">{url}</div></article>\n'
+    yield "</main>\n"
+    suggestions = document.get("suggestions") or []
+    if suggestions:
+        yield '<ul id="suggestions">'
+        for suggestion in suggestions:
+            yield f"<li>{escape(_text(suggestion))}</li>"
+        yield "</ul>\n"
+    yield "</body></html>\n"
+
+
+RENDERERS: dict[str, Callable[[dict[str, Any]], Iterator[str]]] = {
+    "csv": render_csv,
+    "rss": render_rss,
+    "html": render_html,
+}
+
+
+def render(format: str, document: dict[str, Any]) -> str | None:
+    "`document` rendered in `format`, or None when it has no renderer."
+    renderer = RENDERERS.get(format)
+    if renderer is None:
+        return None
+    return "".join(renderer(document))
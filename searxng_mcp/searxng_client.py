@@ -1,12 +1,63 @@
-import json
+import asyncio
+import logging
+import random
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from enum import Enum
-from inspect import Parameter, signature
-from typing import Annotated, Any, Callable, Literal
+from functools import lru_cache, partial
+from inspect import Parameter, ismethod, signature
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Collection,
+    Literal,
+    Mapping,
+    Sequence,
+    get_args,
+    get_origin,
+)
 
+from autocomplete import PrefixCache, normalize_prefix, parse_suggestions
+from backends import Backend, BackendPool, BalancingStrategy
+from breaker import CircuitBreaker, CircuitOpen
+from cache import ResultCache, canonical_key
+from capabilities import CapabilityIndex, UnsupportedPolicy
+from compression import accept_encoding
+from decoding import loads
+from engine_health import EngineHealth
 from fastmcp.exceptions import ToolError
 from fastmcp.tools.tool import ToolResult
-from httpx import AsyncClient
-from pydantic import Field
+from hedging import Hedger
+from hot_queries import HotQueryTracker, RefreshScheduler
+from httpx import (
+    AsyncClient,
+    HTTPStatusError,
+    Limits,
+    RequestError,
+    Response,
+    Timeout,
+)
+from limiter import AdaptiveLimiter, LimiterOverloaded
+from metrics import SearchMetrics
+from page_fetcher import PageCache, PageFetcher
+from persistent_cache import PersistentCache
+from pydantic import BaseModel, Field, create_model
+from renderers import RENDERERS, render
+from shaping import ResponseField, shape_document
+from singleflight import SingleFlight
+from tracing import (
+    ConnectionTrace,
+    NoopTracer,
+    Tracer,
+    current_timing,
+    span,
+    trace_search,
+)
+
+
+Format = Literal["html", "json", "csv", "rss"]
 
 
 class Categories(Enum):
@@ -245,41 +296,368 @@ class Plugins(Enum):
     tor_check_plugin = "Tor_check_plugin"
 
 
-def parse_args(func: Callable[..., Any], raw_args: dict[str, Any]) -> dict[str, Any]:
-    sig = signature(func)
-    cleaned = {}
-    for name, param in sig.parameters.items():
-        is_optional = param.default is not Parameter.empty or getattr(
-            param.annotation, "__origin__", None
-        ) is type(None)
+def _is_enum_list(annotation: Any) -> bool:
+    if get_origin(annotation) is list:
+        item = next(iter(get_args(annotation)), None)
+        return isinstance(item, type) and issubclass(item, Enum)
+    return any(_is_enum_list(arg) for arg in get_args(annotation))
 
-        if name not in raw_args:
-            if is_optional:
-                continue
-            else:
-                raise ToolError(f"{name!r} is required and cannot be empty.")
 
-        value = raw_args[name]
-        is_empty = value in ("", [], None)
+class ArgsEncoder:
+    """
+    Precompiled `parse_args` for one function.
+
+    The signature is inspected once: which parameters are optional, which take
+    enum lists that SearXNG expects comma separated, and their defaults.
+    Calling the encoder only walks that plan.
+    """
 
-        if is_empty:
-            if not is_optional:
-                raise ToolError(f"{name!r} is required and cannot be empty.")
-            continue
+    def __init__(self, func: Callable[..., Any], exclude: Collection[str] = ()):
+        self.plan: list[tuple[str, bool, bool]] = []
+        self.defaults: dict[str, Any] = {}
+        self.list_params: set[str] = set()
+        for name, param in signature(func).parameters.items():
+            if name in exclude:
+                continue
+            is_optional = param.default is not Parameter.empty or getattr(
+                param.annotation, "__origin__", None
+            ) is type(None)
+            is_enum_list = _is_enum_list(param.annotation)
+            self.plan.append((name, is_optional, is_enum_list))
+            if param.default is not Parameter.empty:
+                self.defaults[name] = param.default
+            if is_enum_list:
+                self.list_params.add(name)
 
-        if type(value).__name__ == "list":
-            if all(isinstance(item, Enum) for item in value):
+    def __call__(self, raw_args: Mapping[str, Any]) -> dict[str, Any]:
+        cleaned = {}
+        for name, is_optional, is_enum_list in self.plan:
+            value = raw_args.get(name)
+            if value is None or value == "" or value == []:
+                if not is_optional:
+                    raise ToolError(f"{name!r} is required and cannot be empty.")
+                continue
+            if is_enum_list:
                 value = ", ".join([item.value for item in value])
-                pass
+            cleaned[name] = value
+        return cleaned
+
+    def key(self, args: Mapping[str, Any]) -> str:
+        "Cache key of encoded `args`, see `canonical_key`."
+        return canonical_key(args, self.defaults, self.list_params)
+
+
+@lru_cache(maxsize=128)
+def _encoder(
+    func: Callable[..., Any], exclude: frozenset[str], bound: bool
+) -> ArgsEncoder:
+    if bound:
+        exclude |= {next(iter(signature(func).parameters))}
+    return ArgsEncoder(func, exclude)
+
+
+def parse_args(
+    func: Callable[..., Any],
+    raw_args: dict[str, Any],
+    exclude: Collection[str] = (),
+) -> dict[str, Any]:
+    # Methods share one plan across instances, keyed by their function.
+    bound = ismethod(func)
+    if bound:
+        func = func.__func__
+    return _encoder(func, frozenset(exclude), bound)(raw_args)
+
+
+def _to_result(body: bytes) -> ToolResult:
+    with span("decode"):
+        try:
+            document = loads(body)
+        except ValueError as e:
+            raise ToolError(f"SearXNG returned invalid json: {e}") from e
+    with span("serialize"):
+        return ToolResult(structured_content=document)
+
+
+def _rendered(format: str, document: dict[str, Any]) -> dict[str, Any]:
+    "`document` rendered as `format` text, keeping whether it was truncated."
+    rendered = {"results": render(format, document)}
+    if document.get("truncated"):
+        rendered["truncated"] = True
+    return rendered
+
+
+def _upstream_failed(status_code: int) -> bool:
+    "Whether a status means SearXNG is struggling, as opposed to a bad request."
+    return status_code == 429 or status_code >= 500
+
+
+def _answered(attempt: "asyncio.Future[tuple[Response, bytes]]") -> bool:
+    "Whether a finished attempt got a response worth returning."
+    if attempt.exception() is not None:
+        return False
+    response, _ = attempt.result()
+    return not _upstream_failed(response.status_code)
+
+
+def _retry_after(value: str | None) -> float | None:
+    "Seconds to wait according to a Retry-After header, if it is valid."
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max((retry_at - datetime.now(UTC)).total_seconds(), 0.0)
 
-        cleaned[name] = value
 
-    return cleaned
+def _model_from_signature(name: str, func: Callable[..., Any]) -> type[BaseModel]:
+    fields: dict[str, Any] = {
+        param_name: (
+            param.annotation,
+            ... if param.default is Parameter.empty else param.default,
+        )
+        for param_name, param in signature(func).parameters.items()
+        if param_name != "self"
+    }
+    return create_model(name, **fields)
+
+
+logger = logging.getLogger(__name__)
+
+# Parameters of `SearxngClient.search` that control the server, not SearXNG.
+_CONTROL_PARAMS = frozenset(
+    {
+        "format",
+        "no_cache",
+        "pages",
+        "max_results",
+        "fields",
+        "result_fields",
+        "max_text_length",
+        "max_bytes",
+        "timing",
+    }
+)
 
 
 class SearxngClient:
-    def __init__(self, api_url: str):
-        self.api_url = api_url
+    def __init__(
+        self,
+        api_url: str | Sequence[str],
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float | None = None,
+        total_timeout: float | None = 30.0,
+        retries: int = 2,
+        retry_backoff: float = 0.1,
+        retry_backoff_max: float = 2.0,
+        breaker_failures: int = 5,
+        breaker_reset: float = 30.0,
+        hedge_quantile: float | None = None,
+        hedge_max_ratio: float = 0.1,
+        cache_max_entries: int = 1024,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_ttl: float = 300.0,
+        cache_ttls: Mapping[str, float] | None = None,
+        balancing_strategy: BalancingStrategy = "least_outstanding",
+        max_backend_failures: int = 3,
+        probe_interval: float = 10.0,
+        failover_attempts: int = 3,
+        batch_concurrency: int = 8,
+        batch_max_queries: int = 20,
+        page_concurrency: int = 5,
+        max_pages: int = 10,
+        result_max_bytes: int | None = None,
+        max_response_bytes: int = 8 * 1024 * 1024,
+        thread_decode_bytes: int = 256 * 1024,
+        persistent_cache_path: str | None = None,
+        persistent_cache_stale_ttl: float = 3600.0,
+        persistent_cache_max_entries: int = 100_000,
+        autocomplete_cache_entries: int = 10_000,
+        autocomplete_cache_ttl: float = 600.0,
+        fetch_max_connections: int = 20,
+        fetch_max_per_host: int = 2,
+        fetch_max_bytes: int = 2 * 1024 * 1024,
+        fetch_timeout: float = 10.0,
+        fetch_cache_entries: int = 256,
+        fetch_max_pages: int = 10,
+        fetch_private_networks: bool = False,
+        hot_queries: int = 0,
+        hot_query_max_age: float = 60.0,
+        hot_query_half_life: float = 300.0,
+        hot_refresh_budget: float = 30.0,
+        concurrency_limit: int = 20,
+        max_concurrency: int = 100,
+        queue_size: int = 100,
+        queue_timeout: float = 5.0,
+        tracer: Tracer | None = None,
+        trace_sample_rate: float = 0.0,
+        engine_cool_down: float = 300.0,
+        engine_failure_threshold: float = 3.0,
+        engine_health_half_life: float = 600.0,
+        capabilities_refresh: float | None = None,
+        unsupported_policy: UnsupportedPolicy = "strip",
+    ):
+        # A comma separated string configures several SearXNG instances.
+        if isinstance(api_url, str):
+            api_url = [url.strip() for url in api_url.split(",") if url.strip()]
+        self.api_url = api_url[0]
+        self.backends = BackendPool(
+            api_url,
+            strategy=balancing_strategy,
+            max_failures=max_backend_failures,
+            probe_interval=probe_interval,
+        )
+        self.limiter = AdaptiveLimiter(
+            initial_limit=concurrency_limit,
+            max_limit=max_concurrency,
+            queue_size=queue_size,
+            queue_timeout=queue_timeout,
+        )
+        self.failover_attempts = failover_attempts
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.total_timeout = total_timeout
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset)
+        self.hedger = (
+            Hedger(quantile=hedge_quantile, max_ratio=hedge_max_ratio)
+            if hedge_quantile is not None
+            else None
+        )
+        self.batch_concurrency = batch_concurrency
+        self.batch_max_queries = batch_max_queries
+        self.page_concurrency = page_concurrency
+        self.max_pages = max_pages
+        self.result_max_bytes = result_max_bytes
+        self.max_response_bytes = max_response_bytes
+        self.thread_decode_bytes = thread_decode_bytes
+        self.limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = Timeout(
+            timeout,
+            connect=connect_timeout,
+            read=timeout if read_timeout is None else read_timeout,
+        )
+        self.http2 = http2
+        self._http_client: AsyncClient | None = None
+        self._users = 0
+        self._background: set[asyncio.Task[None]] = set()
+        self.cache = ResultCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            default_ttl=cache_ttl,
+            ttls=cache_ttls,
+        )
+        self.persistent_cache = (
+            PersistentCache(
+                persistent_cache_path,
+                stale_ttl=persistent_cache_stale_ttl,
+                max_entries=persistent_cache_max_entries,
+            )
+            if persistent_cache_path
+            else None
+        )
+        self._in_flight: SingleFlight[ToolResult] = SingleFlight()
+        self.suggestions = PrefixCache(
+            max_entries=autocomplete_cache_entries, ttl=autocomplete_cache_ttl
+        )
+        self._suggesting: SingleFlight[list[str]] = SingleFlight()
+        self.page_fetcher = PageFetcher(
+            max_connections=fetch_max_connections,
+            max_per_host=fetch_max_per_host,
+            max_bytes=fetch_max_bytes,
+            timeout=fetch_timeout,
+            cache=PageCache(max_entries=fetch_cache_entries),
+            allow_private_networks=fetch_private_networks,
+        )
+        self.fetch_max_pages = fetch_max_pages
+        self.hot_queries = HotQueryTracker(half_life=hot_query_half_life)
+        self.refresh_scheduler = (
+            RefreshScheduler(
+                self.hot_queries,
+                self._refresh,
+                max_queries=hot_queries,
+                max_age=hot_query_max_age,
+                budget_per_minute=hot_refresh_budget,
+            )
+            if hot_queries > 0
+            else None
+        )
+        self._encode_args = ArgsEncoder(self.search, exclude=_CONTROL_PARAMS)
+        self.engine_health = (
+            EngineHealth(
+                half_life=engine_health_half_life,
+                threshold=engine_failure_threshold,
+                cool_down=engine_cool_down,
+            )
+            if engine_cool_down > 0
+            else None
+        )
+        self.capabilities: CapabilityIndex | None = None
+        self.capabilities_refresh = capabilities_refresh
+        self.unsupported_policy = unsupported_policy
+        self.tracer = tracer or NoopTracer()
+        self.trace_sample_rate = trace_sample_rate
+        self.metrics = SearchMetrics()
+        self.metrics.watch(self)
+
+    def _get_http_client(self) -> AsyncClient:
+        "Pooled client shared by every search, created on first use."
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                # Decoded chunk by chunk as the body streams in, see `_send`.
+                headers={"Accept-Encoding": accept_encoding()},
+            )
+        return self._http_client
+
+    async def __aenter__(self) -> "SearxngClient":
+        # Reference counted so overlapping server sessions share one pool.
+        self._users += 1
+        client = self._get_http_client()
+        if self._users == 1 and len(self.backends) > 1:
+            self._spawn(self.backends.run_prober(client))
+        if self._users == 1 and self.refresh_scheduler is not None:
+            self._spawn(self.refresh_scheduler.run())
+        if self._users == 1 and self.capabilities_refresh:
+            self._spawn(self._refresh_capabilities())
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self._users -= 1
+        if self._users == 0:
+            await self.aclose()
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def aclose(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+        await self.page_fetcher.aclose()
 
     async def search(
         self,
@@ -332,7 +710,7 @@ class SearxngClient:
             | None
         ) = None,
         format: Annotated[
-            Literal["html", "json", "csv", "rss"],
+            Format,
             Field(description="Output format of results. Defaults to json."),
         ] = "json",
         image_proxy: (
@@ -400,16 +778,609 @@ class SearxngClient:
             ]
             | None
         ) = None,
+        no_cache: Annotated[
+            bool,
+            Field(description="Skip cached results and fetch fresh ones."),
+        ] = False,
+        pages: Annotated[
+            int,
+            Field(
+                description="""
+                    Number of consecutive pages to fetch, starting at the page
+                    number. Pages are fetched concurrently and merged into one
+                    result without duplicate urls.
+                """,
+                ge=1,
+            ),
+        ] = 1,
+        max_results: (
+            Annotated[
+                int,
+                Field(
+                    description="""
+                        Maximum number of results returned. When fetching several
+                        pages, fetching stops once this many results are found.
+                    """,
+                    ge=1,
+                ),
+            ]
+            | None
+        ) = None,
+        fields: (
+            Annotated[
+                list[ResponseField],
+                Field(description="Top level fields of the json result to keep."),
+            ]
+            | None
+        ) = None,
+        result_fields: (
+            Annotated[
+                list[str],
+                Field(
+                    description="""
+                        Fields to keep in each result, e.g. url, title, content.
+                    """
+                ),
+            ]
+            | None
+        ) = None,
+        max_text_length: (
+            Annotated[
+                int,
+                Field(description="Truncate text longer than this.", ge=1),
+            ]
+            | None
+        ) = None,
+        max_bytes: (
+            Annotated[
+                int,
+                Field(
+                    description="""
+                        Size budget of the result in bytes. Results are dropped
+                        from the end until it fits.
+                    """,
+                    ge=1,
+                ),
+            ]
+            | None
+        ) = None,
+        timing: Annotated[
+            bool,
+            Field(
+                description="""
+                    Add a `_timing` block with the milliseconds spent in each
+                    phase of the search.
+                """,
+            ),
+        ] = False,
     ) -> ToolResult:
         "Searches query using searxng."
-        args = parse_args(self.search, locals())
-        client = AsyncClient(base_url=self.api_url)
-        response = await client.get("/search", params=args)
-        response.raise_for_status()
-
-        match format:
-            case "json":
-                return ToolResult(
-                    structured_content=json.loads(response.text),
+        started = time.perf_counter()
+        args = self._encode_args(locals())
+        args, warnings = self._check_capabilities(args)
+        if self.engine_health is not None and "engines" not in args:
+            args = self._without_unhealthy_engines(args)
+        sampled = timing or random.random() < self.trace_sample_rate
+        with trace_search(self.tracer if sampled else None) as recorder:
+            if recorder is not None:
+                recorder.add("parse_args", time.perf_counter() - started)
+            if pages == 1:
+                result = await self._fetch_page(args, no_cache)
+            elif pages > self.max_pages:
+                raise ToolError(
+                    f"At most {self.max_pages} pages can be fetched at once."
+                )
+            else:
+                result = await self._fetch_pages(args, pages, max_results, no_cache)
+
+            if self.result_max_bytes is not None:
+                max_bytes = min(
+                    max_bytes or self.result_max_bytes, self.result_max_bytes
+                )
+            output = partial(_rendered, format) if format in RENDERERS else None
+            if fields or result_fields or max_results or max_text_length or max_bytes:
+                with span("shape"):
+                    document = shape_document(
+                        result.structured_content or {},
+                        fields=fields,
+                        result_fields=result_fields,
+                        max_results=max_results,
+                        max_text_length=max_text_length,
+                        max_bytes=max_bytes,
+                        output=output,
+                    )
+                with span("serialize"):
+                    result = ToolResult(structured_content=document)
+            if output is not None:
+                with span("render"):
+                    document = output(result.structured_content or {})
+                result = ToolResult(structured_content=document)
+
+        notes: dict[str, Any] = {}
+        if warnings:
+            notes["_warnings"] = warnings
+        if timing and recorder is not None:
+            recorder.add("total", time.perf_counter() - started)
+            notes["_timing"] = recorder.as_dict()
+        if notes:
+            document = result.structured_content or {}
+            return ToolResult(structured_content={**document, **notes})
+        return result
+
+    def _check_capabilities(
+        self, args: dict[str, Any]
+    ) -> tuple[dict[str, Any], list[str]]:
+        "Rejects or strips what the instance's /config says it does not support."
+        index = self.capabilities
+        if index is None or self.unsupported_policy == "ignore":
+            return args, []
+        unsupported = index.unsupported(args)
+        if not unsupported:
+            return args, []
+
+        described = "; ".join(
+            f"{arg}: {', '.join(names)}" for arg, names in unsupported.items()
+        )
+        if self.unsupported_policy == "reject":
+            raise ToolError(f"Not supported by this SearXNG instance: {described}.")
+        stripped = index.strip(args, unsupported)
+        for arg in ("engines", "categories"):
+            # Searching everything instead of nothing would surprise the caller.
+            if arg in args and arg not in stripped:
+                raise ToolError(
+                    f"None of the requested {arg} are available: {described}."
+                )
+        warning = f"Ignored what this SearXNG instance does not support: {described}."
+        logger.warning(warning)
+        return stripped, [warning]
+
+    async def load_capabilities(self) -> CapabilityIndex:
+        "Fetches the instance's /config and indexes it."
+        _, body = await self._request("/config", {})
+        self.capabilities = CapabilityIndex(loads(body))
+        return self.capabilities
+
+    async def _refresh_capabilities(self) -> None:
+        while True:
+            try:
+                await self.load_capabilities()
+            except Exception as e:
+                logger.warning(f"Loading the SearXNG /config failed: {e}")
+            await asyncio.sleep(self.capabilities_refresh)
+
+    def _without_unhealthy_engines(self, args: dict[str, Any]) -> dict[str, Any]:
+        "Adds the engines cooling down to `disabled_engines`, unless enabled by name."
+        enabled = {e.strip() for e in args.get("enabled_engines", "").split(",")}
+        unhealthy = set(self.engine_health.disabled()) - enabled
+        if not unhealthy:
+            return args
+        requested = args.get("disabled_engines", "").split(",")
+        disabled = {engine.strip() for engine in requested if engine.strip()}
+        disabled.update(unhealthy)
+        return {**args, "disabled_engines": ", ".join(sorted(disabled))}
+
+    async def autocomplete(
+        self,
+        q: Annotated[
+            str,
+            Field(
+                title="query",
+                description="Beginning of a search query to suggest completions for.",
+                min_length=1,
+            ),
+        ],
+    ) -> ToolResult:
+        """
+        Suggests completions of a partial search query using searxng's
+        autocompleter. Much cheaper than a search.
+        """
+        prefix = normalize_prefix(q)
+        if not prefix:
+            # Blank input has nothing to complete, and the empty prefix would
+            # match every cached suggestion.
+            return ToolResult(structured_content={"query": q, "suggestions": []})
+        suggestions = self.suggestions.get(prefix)
+        if suggestions is None:
+            suggestions = await self._suggesting.do(
+                prefix, lambda: self._fetch_suggestions(prefix)
+            )
+        return ToolResult(structured_content={"query": q, "suggestions": suggestions})
+
+    async def _fetch_suggestions(self, prefix: str) -> list[str]:
+        _, body = await self._request("/autocompleter", {"q": prefix})
+        try:
+            suggestions = parse_suggestions(loads(body))
+        except ValueError as e:
+            raise ToolError(f"SearXNG returned invalid json: {e}") from e
+        self.suggestions.set(prefix, suggestions)
+        return suggestions
+
+    # One entry of `search_many`, mirroring the `search` parameters.
+    SearchQuery = _model_from_signature("SearchQuery", search)
+
+    async def search_many(
+        self,
+        queries: Annotated[
+            list[SearchQuery],
+            Field(
+                description="""
+                    Searches to run concurrently. Each entry accepts the same
+                    parameters as the search tool.
+                """,
+                min_length=1,
+            ),
+        ],
+        max_concurrency: (
+            Annotated[
+                int,
+                Field(description="Maximum searches running at once.", ge=1),
+            ]
+            | None
+        ) = None,
+    ) -> ToolResult:
+        "Runs several searxng searches concurrently and returns every result."
+        if len(queries) > self.batch_max_queries:
+            raise ToolError(
+                f"At most {self.batch_max_queries} queries can be searched at once."
+            )
+        limit = asyncio.Semaphore(
+            min(max_concurrency or self.batch_concurrency, self.batch_concurrency)
+        )
+
+        async def run(query: "SearxngClient.SearchQuery") -> dict[str, Any]:
+            async with limit:
+                try:
+                    result = await self.search(**dict(query))
+                except Exception as e:
+                    return {"q": query.q, "error": f"{type(e).__name__}: {e}"}
+            return {"q": query.q, "result": result.structured_content}
+
+        results = await asyncio.gather(*(run(query) for query in queries))
+        return ToolResult(structured_content={"results": results})
+
+    async def search_and_fetch(
+        self,
+        q: Annotated[str, Field(title="query", description="The search query.")],
+        top_k: Annotated[
+            int,
+            Field(description="Number of top results whose pages are fetched.", ge=1),
+        ] = 3,
+        max_page_chars: Annotated[
+            int,
+            Field(description="Maximum characters of text kept per page.", ge=1),
+        ] = 5000,
+        categories: (
+            Annotated[
+                list[Categories],
+                Field(description="List of the active search categories."),
+            ]
+            | None
+        ) = None,
+        engines: (
+            Annotated[
+                list[Engines],
+                Field(description="List of the active search engines."),
+            ]
+            | None
+        ) = None,
+        language: (
+            Annotated[
+                str,
+                Field(description="ISO language code."),
+            ]
+            | None
+        ) = None,
+        time_range: (
+            Annotated[
+                Literal["day", "month", "year"],
+                Field(description="Time range of search for engines which support it."),
+            ]
+            | None
+        ) = None,
+    ) -> ToolResult:
+        """
+        Runs a searxng search, then fetches the pages of the top results
+        concurrently and returns their readable text with the results.
+        """
+        if top_k > self.fetch_max_pages:
+            raise ToolError(
+                f"At most {self.fetch_max_pages} pages can be fetched at once."
+            )
+        result = await self.search(
+            q=q,
+            categories=categories,
+            engines=engines,
+            language=language,
+            time_range=time_range,
+        )
+        document = result.structured_content or {}
+        urls = [r["url"] for r in document.get("results", []) if r.get("url")][:top_k]
+
+        async def fetch(url: str) -> dict[str, Any]:
+            page = await self.page_fetcher.fetch(url)
+            if len(page.get("text", "")) > max_page_chars:
+                page = {
+                    **page,
+                    "text": page["text"][:max_page_chars],
+                    "truncated": True,
+                }
+            return page
+
+        pages = await asyncio.gather(*(fetch(url) for url in urls))
+        return ToolResult(structured_content={**document, "pages": pages})
+
+    async def _fetch_page(self, args: dict[str, Any], no_cache: bool) -> ToolResult:
+        key = self._encode_args.key(args)
+        if self.refresh_scheduler is not None:
+            self.hot_queries.record(key, args)
+        if not no_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            if self.persistent_cache is not None:
+                with span("persistent_cache"):
+                    entry = await self.persistent_cache.get(key)
+                if entry is not None:
+                    result = ToolResult(structured_content=entry.document)
+                    if entry.stale:
+                        # Serve it now and refresh it off the request path.
+                        self._spawn(self._revalidate(key, args))
+                    else:
+                        self.cache.set(key, result, entry.size, entry.ttl)
+                    return result
+
+        return await self._in_flight.do(key, lambda: self._fetch(key, args))
+
+    async def _revalidate(self, key: str, args: dict[str, Any]) -> None:
+        try:
+            await self._refresh(key, args)
+        except Exception as e:
+            logger.warning(f"Refreshing stale search result failed: {e}")
+
+    async def _refresh(self, key: str, args: dict[str, Any]) -> None:
+        await self._in_flight.do(key, lambda: self._fetch(key, args))
+
+    async def _fetch_pages(
+        self,
+        args: dict[str, Any],
+        pages: int,
+        max_results: int | None,
+        no_cache: bool,
+    ) -> ToolResult:
+        """
+        Fetches `pages` pages in windows of `page_concurrency` and merges their
+        results, stopping at the first page that adds no new urls.
+        """
+        first_page = args.get("pageno", 1)
+        page_numbers = range(first_page, first_page + pages)
+        merged: dict[str, Any] | None = None
+        results: list[dict[str, Any]] = []
+        seen: set[str] = set()
+
+        done = False
+        for start in range(0, pages, self.page_concurrency):
+            window = page_numbers[start : start + self.page_concurrency]
+            fetched = await asyncio.gather(
+                *(self._fetch_page({**args, "pageno": n}, no_cache) for n in window)
+            )
+            for page in fetched:
+                document = page.structured_content or {}
+                if merged is None:
+                    merged = dict(document)
+                new_results = [
+                    result
+                    for result in document.get("results", [])
+                    if result.get("url") not in seen
+                ]
+                seen.update(result.get("url") for result in new_results)
+                results.extend(new_results)
+                enough = max_results is not None and len(results) >= max_results
+                done = not new_results or enough
+                if done:
+                    break
+            if done:
+                break
+
+        merged = merged or {}
+        merged["results"] = results[:max_results]
+        return ToolResult(structured_content=merged)
+
+    async def _fetch(self, key: str, args: dict[str, Any]) -> ToolResult:
+        # Always json: every output format is rendered from the same document,
+        # so they share one upstream search and one cache entry.
+        _, body = await self._request("/search", {**args, "format": "json"})
+
+        started = time.perf_counter()
+        if len(body) >= self.thread_decode_bytes:
+            # Large documents would stall every other session on the loop.
+            result = await asyncio.to_thread(_to_result, body)
+        else:
+            result = _to_result(body)
+        self.metrics.decode_latency.observe(time.perf_counter() - started)
+        if self.engine_health is not None:
+            self.engine_health.observe(result.structured_content)
+
+        # Overrides are per category; a search in several uses its first.
+        category = args.get("categories", "").split(",")[0].strip()
+        ttl = self.cache.ttl_for(category or None)
+        self.cache.set(key, result, len(body), ttl)
+        self.hot_queries.mark_fetched(key)
+        if self.persistent_cache is not None:
+            self._spawn(self.persistent_cache.set(key, result.structured_content, ttl))
+        return result
+
+    async def _request(
+        self, path: str, params: dict[str, Any]
+    ) -> tuple[Response, bytes]:
+        "Sends a GET within `total_timeout`, failing fast while SearXNG is down."
+        try:
+            self.breaker.before_call()
+        except CircuitOpen as e:
+            raise ToolError(f"SearXNG is unavailable. {e}") from None
+
+        try:
+            async with asyncio.timeout(self.total_timeout) as scope:
+                response, body = await self._request_with_retries(
+                    path, params, scope.when()
                 )
-        return ToolResult(structured_content={"results": response.text})
+        except TimeoutError:
+            self.breaker.record(ok=False)
+            raise ToolError(
+                f"SearXNG did not answer within {self.total_timeout} seconds."
+            ) from None
+        except RequestError:
+            self.breaker.record(ok=False)
+            raise
+        except HTTPStatusError as e:
+            self.breaker.record(ok=not _upstream_failed(e.response.status_code))
+            raise
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        self.breaker.record(ok=True)
+        return response, body
+
+    async def _request_with_retries(
+        self, path: str, params: dict[str, Any], deadline: float | None
+    ) -> tuple[Response, bytes]:
+        """
+        Fails over to untried backends at once, then retries with jittered
+        exponential backoff on connection errors, 429 and 5xx responses.
+        """
+        failovers = min(self.failover_attempts, len(self.backends))
+        attempts = failovers + self.retries
+        tried: list[Backend] = []
+        while True:
+            backend = self.backends.select(exclude=tried)
+            tried.append(backend)
+            last_attempt = len(tried) >= attempts
+            retry = len(tried) - failovers + 1
+
+            try:
+                with span("queue"):
+                    await self.limiter.acquire()
+            except LimiterOverloaded as e:
+                raise ToolError(f"SearXNG is overloaded, try again later. {e}")
+
+            try:
+                response, body = await self._hedged_attempt(backend, path, params)
+            except RequestError:
+                if last_attempt or not await self._backoff(retry, None, deadline):
+                    raise
+                continue
+
+            if _upstream_failed(response.status_code) and not last_attempt:
+                retry_after = _retry_after(response.headers.get("Retry-After"))
+                if await self._backoff(retry, retry_after, deadline):
+                    continue
+            response.raise_for_status()
+            return response, body
+
+    async def _attempt(
+        self, backend: Backend, path: str, params: dict[str, Any]
+    ) -> tuple[Response, bytes]:
+        "Sends one request to `backend` on a limiter slot the caller acquired."
+        backend.outstanding += 1
+        started = time.perf_counter()
+        try:
+            response, body = await self._send(backend.endpoint(path), params)
+        except RequestError:
+            elapsed = time.perf_counter() - started
+            self.backends.observe(backend, elapsed, ok=False)
+            self.limiter.release(elapsed, ok=False)
+            self.metrics.upstream_responses.inc("error")
+            raise
+        except BaseException:
+            self.limiter.release()
+            raise
+        finally:
+            backend.outstanding -= 1
+
+        failed = _upstream_failed(response.status_code)
+        elapsed = time.perf_counter() - started
+        self.metrics.upstream_responses.inc(str(response.status_code))
+        self.metrics.upstream_latency.observe(elapsed)
+        self.metrics.upstream_bytes.inc(amount=len(body))
+        self.metrics.upstream_wire_bytes.inc(amount=response.num_bytes_downloaded)
+        self.backends.observe(backend, elapsed, ok=not failed)
+        self.limiter.release(elapsed, ok=not failed)
+        if self.hedger is not None and not failed:
+            self.hedger.observe(elapsed)
+        return response, body
+
+    async def _hedged_attempt(
+        self, backend: Backend, path: str, params: dict[str, Any]
+    ) -> tuple[Response, bytes]:
+        """
+        Sends a second request, preferably to another backend, when the first
+        is slower than the hedging threshold. The first good answer wins and
+        the other request is cancelled.
+        """
+        delay = self.hedger.delay() if self.hedger is not None else None
+        if delay is None:
+            return await self._attempt(backend, path, params)
+
+        attempts = {asyncio.ensure_future(self._attempt(backend, path, params))}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done and self.hedger.can_hedge() and self.limiter.try_acquire():
+                self.hedger.spend()
+                other = self.backends.select(exclude=[backend])
+                attempts.add(asyncio.ensure_future(self._attempt(other, path, params)))
+
+            while True:
+                done, _ = await asyncio.wait(
+                    attempts, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    attempts.discard(attempt)
+                    if not attempts or _answered(attempt):
+                        return attempt.result()
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    async def _backoff(
+        self, retry: int, retry_after: float | None, deadline: float | None
+    ) -> bool:
+        "Waits before `retry`, or returns False if that would miss the deadline."
+        if retry <= 0:
+            # Another backend has not been tried yet.
+            return True
+        cap = min(self.retry_backoff_max, self.retry_backoff * 2 ** (retry - 1))
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        loop = asyncio.get_running_loop()
+        if deadline is not None and loop.time() + delay >= deadline:
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+    async def _send(self, url: str, params: dict[str, Any]) -> tuple[Response, bytes]:
+        """
+        Streams and decompresses the response body, aborting once it exceeds
+        `max_response_bytes` decompressed.
+        """
+        client = self._get_http_client()
+        timing = current_timing()
+        extensions = {} if timing is None else {"trace": ConnectionTrace(timing)}
+        request = client.build_request("GET", url, params=params, extensions=extensions)
+        response = await client.send(request, stream=True)
+        try:
+            if response.is_error:
+                return response, b""
+
+            limit = self.max_response_bytes
+            declared = response.headers.get("Content-Length", "")
+            if declared.isdigit() and int(declared) > limit:
+                raise ToolError(f"SearXNG response is larger than {limit} bytes.")
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > limit:
+                    raise ToolError(f"SearXNG response is larger than {limit} bytes.")
+            return response, bytes(body)
+        finally:
+            await response.aclose()
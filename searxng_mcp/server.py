@@ -1,11 +1,54 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, get_args
+
 from fastmcp import FastMCP
-from searxng_client import SearxngClient
+from metrics import CONTENT_TYPE, ToolMetricsMiddleware
+from searxng_client import Categories, Format, SearxngClient
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def create_mcp_server(searxng_client: SearxngClient) -> FastMCP:
+    @asynccontextmanager
+    async def lifespan(_: FastMCP) -> AsyncIterator[SearxngClient]:
+        async with searxng_client:
+            yield searxng_client
+
+    mcp = FastMCP("Searxng", lifespan=lifespan)
 
+    # Only served by the http transport.
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(_: Request) -> Response:
+        return Response(searxng_client.metrics.render(), media_type=CONTENT_TYPE)
 
-def create_mcp_server(api_url: str) -> FastMCP:
-    mcp = FastMCP("Searxng")
-    searxng_client = SearxngClient(api_url)
+    @mcp.resource(
+        "searxng://capabilities",
+        name="capabilities",
+        description="Categories, engines and plugins of the SearXNG instance, "
+        "from its /config, with whether each engine and plugin is enabled.",
+        mime_type="application/json",
+    )
+    async def capabilities() -> dict[str, Any]:
+        index = searxng_client.capabilities
+        if index is None:
+            index = await searxng_client.load_capabilities()
+        return index.as_dict()
 
-    mcp.tool(searxng_client.search)
+    tools = (
+        searxng_client.search,
+        searxng_client.autocomplete,
+        searxng_client.search_many,
+        searxng_client.search_and_fetch,
+    )
+    mcp.add_middleware(
+        ToolMetricsMiddleware(
+            searxng_client.metrics,
+            tools=[tool.__name__ for tool in tools],
+            formats=get_args(Format),
+            categories=[category.value for category in Categories],
+        )
+    )
+    for tool in tools:
+        mcp.tool(tool)
 
     return mcp
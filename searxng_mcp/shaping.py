@@ -0,0 +1,122 @@
+import json
+from collections.abc import Callable, Collection
+from typing import Any, Literal
+
+ResponseField = Literal[
+    "query",
+    "number_of_results",
+    "results",
+    "answers",
+    "corrections",
+    "infoboxes",
+    "suggestions",
+    "unresponsive_engines",
+]
+
+# Dropped in this order before any result when a document is over budget.
+_EXPENDABLE_FIELDS = (
+    "infoboxes",
+    "unresponsive_engines",
+    "corrections",
+    "suggestions",
+    "answers",
+)
+
+
+def _encoded_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def _keeps_full_text(key: str) -> bool:
+    # Cutting links short would make them useless.
+    return "url" in key or key.endswith("src")
+
+
+def truncate_text(value: Any, limit: int) -> Any:
+    "Shortens every string nested in `value` to at most `limit` characters."
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[: max(limit - 1, 0)] + "…"
+    if isinstance(value, list):
+        return [truncate_text(item, limit) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: item if _keeps_full_text(key) else truncate_text(item, limit)
+            for key, item in value.items()
+        }
+    return value
+
+
+def _fit_to_budget(
+    document: dict[str, Any],
+    max_bytes: int,
+    output: Callable[[dict[str, Any]], Any] | None,
+) -> dict[str, Any]:
+    def size(document: dict[str, Any]) -> int:
+        return _encoded_size(document if output is None else output(document))
+
+    if size(document) <= max_bytes:
+        return document
+    document["truncated"] = True
+
+    results = document.get("results")
+    if not isinstance(results, list):
+        return document
+
+    # Results matter most, so side sections go first.
+    for field in _EXPENDABLE_FIELDS:
+        document.pop(field, None)
+        if size(document) <= max_bytes:
+            return document
+
+    # Keep the longest prefix of results that fits, searching by halves as
+    # each size check may render the whole output.
+    low, high = 0, len(results)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if size({**document, "results": results[:middle]}) <= max_bytes:
+            low = middle
+        else:
+            high = middle - 1
+    document["results"] = results[:low]
+    return document
+
+
+def shape_document(
+    document: dict[str, Any],
+    fields: Collection[str] | None = None,
+    result_fields: Collection[str] | None = None,
+    max_results: int | None = None,
+    max_text_length: int | None = None,
+    max_bytes: int | None = None,
+    output: Callable[[dict[str, Any]], Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Trims a SearXNG response before it is returned.
+
+    Keeps only `fields` at the top level and `result_fields` in each result,
+    caps the number of results, shortens long strings and finally drops
+    results from the end until the encoded document, or what `output` makes
+    of it, fits in `max_bytes`. The input document is never modified.
+    """
+    if fields:
+        document = {key: value for key, value in document.items() if key in fields}
+    else:
+        document = dict(document)
+
+    results = document.get("results")
+    if isinstance(results, list):
+        if max_results is not None:
+            results = results[:max_results]
+        if result_fields:
+            results = [
+                {key: value for key, value in result.items() if key in result_fields}
+                for result in results
+            ]
+        document["results"] = results
+
+    if max_text_length is not None:
+        document = truncate_text(document, max_text_length)
+
+    if max_bytes is not None:
+        document = _fit_to_budget(document, max_bytes, output)
+    return document
@@ -0,0 +1,111 @@
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Iterator, Protocol
+
+
+class Tracer(Protocol):
+    "The part of OpenTelemetry's `Tracer` that searches are reported to."
+
+    def start_as_current_span(
+        self, name: str, **kwargs: Any
+    ) -> AbstractContextManager[Any]: ...
+
+
+class NoopTracer:
+    def start_as_current_span(
+        self, name: str, **kwargs: Any
+    ) -> AbstractContextManager[Any]:
+        return nullcontext()
+
+
+def opentelemetry_tracer() -> Tracer:
+    "The tracer of the globally configured OpenTelemetry provider."
+    from opentelemetry import trace
+
+    return trace.get_tracer("searxng_mcp")
+
+
+class Timing:
+    "Milliseconds spent in each phase of one search."
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds * 1000
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        with self.tracer.start_as_current_span(f"searxng.{phase}"):
+            try:
+                yield
+            finally:
+                self.add(phase, time.perf_counter() - started)
+
+    def as_dict(self) -> dict[str, float]:
+        return {phase: round(ms, 3) for phase, ms in self.phases.items()}
+
+
+_current: ContextVar[Timing | None] = ContextVar("searxng_timing", default=None)
+
+
+def current_timing() -> Timing | None:
+    return _current.get()
+
+
+@contextmanager
+def trace_search(tracer: Tracer | None) -> Iterator[Timing | None]:
+    """
+    Times the search running in this context, or does nothing without a
+    `tracer`. Phases are recorded with `span` anywhere below, including in
+    tasks and threads started from here.
+    """
+    if tracer is None:
+        yield None
+        return
+    timing = Timing(tracer)
+    token = _current.set(timing)
+    try:
+        with tracer.start_as_current_span("searxng.search"):
+            yield timing
+    finally:
+        _current.reset(token)
+
+
+def span(phase: str) -> AbstractContextManager[None]:
+    timing = _current.get()
+    return nullcontext() if timing is None else timing.span(phase)
+
+
+# httpcore trace events and the phase they belong to.
+_CONNECTION_PHASES = {
+    "connect_tcp": "connect",
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "receive_response_headers": "first_byte",
+    "receive_response_body": "download",
+}
+
+
+class ConnectionTrace:
+    "httpx `trace` extension adding connection level phases to a `Timing`."
+
+    def __init__(self, timing: Timing):
+        self.timing = timing
+        self._started: dict[str, float] = {}
+
+    def __call__(self, event: str, info: dict[str, Any]) -> None:
+        _, _, name = event.partition(".")
+        step, _, stage = name.rpartition(".")
+        phase = _CONNECTION_PHASES.get(step)
+        if phase is None:
+            return
+        if stage == "started":
+            self._started[step] = time.perf_counter()
+        elif step in self._started:
+            self.timing.add(phase, time.perf_counter() - self._started.pop(step))
@@ -0,0 +1,388 @@
+"""
+Serving http from several processes, so decoding and serialization of
+concurrent sessions are spread over every core.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from multiprocessing.synchronize import Event
+from typing import Any
+
+import httpx
+import uvicorn
+from fastmcp import FastMCP
+from searxng_client import SearxngClient
+from starlette.middleware import Middleware
+
+logger = logging.getLogger(__name__)
+
+SESSION_HEADER = b"mcp-session-id"
+
+# Headers describing one connection rather than the message, never forwarded.
+_HOP_BY_HOP = frozenset(
+    {
+        b"connection",
+        b"keep-alive",
+        b"proxy-authenticate",
+        b"proxy-authorization",
+        b"te",
+        b"trailer",
+        b"transfer-encoding",
+        b"upgrade",
+    }
+)
+
+_TAGGED_SESSION = re.compile(rb"w(\d+)p(\d+)-(.+)")
+
+
+def _replace_header(
+    headers: Sequence[tuple[bytes, bytes]], name: bytes, value: bytes
+) -> list[tuple[bytes, bytes]]:
+    return [(k, value if k.lower() == name else v) for k, v in headers]
+
+
+async def _session_not_found(send: Callable) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 404,
+            "headers": [(b"content-type", b"text/plain")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"Session not found"})
+
+
+class SessionAffinity:
+    """
+    ASGI middleware keeping a stateful streamable http session on the worker
+    that created it, as only that worker holds it in memory.
+
+    Session ids handed out by worker `index` are prefixed with
+    `w<index>p<pid>-`. A request for a session of another worker is forwarded
+    to that worker's loopback port in `ports` and its response streamed back.
+    A session whose process is gone, e.g. after a restart, gets a 404, which
+    tells MCP clients to start a new one.
+    """
+
+    def __init__(self, app: Any, index: int, ports: Sequence[int]):
+        self.app = app
+        self.index = index
+        self.ports = ports
+        self.pid = os.getpid()
+        self._prefix = f"w{index}p{self.pid}-".encode()
+        self._client: httpx.AsyncClient | None = None
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        session = next((v for k, v in headers if k.lower() == SESSION_HEADER), None)
+        match = _TAGGED_SESSION.fullmatch(session) if session else None
+        if match is not None:
+            owner = int(match[1])
+            if owner != self.index and owner < len(self.ports):
+                await self._forward(self.ports[owner], scope, receive, send)
+                return
+            if owner == self.index:
+                if int(match[2]) != self.pid:
+                    await _session_not_found(send)
+                    return
+                headers = _replace_header(headers, SESSION_HEADER, match[3])
+                scope = {**scope, "headers": headers}
+
+        async def tagging_send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        (k, self._prefix + v if k.lower() == SESSION_HEADER else v)
+                        for k, v in message.get("headers", [])
+                    ],
+                }
+            await send(message)
+
+        await self.app(scope, receive, tagging_send)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Event streams stay open for as long as the session lives.
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(None, connect=5.0),
+                limits=httpx.Limits(max_connections=None),
+            )
+        return self._client
+
+    async def _forward(
+        self, port: int, scope: dict, receive: Callable, send: Callable
+    ) -> None:
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        path = scope.get("raw_path") or scope["path"].encode()
+        if scope.get("query_string"):
+            path += b"?" + scope["query_string"]
+        request = self._get_client().build_request(
+            scope["method"],
+            f"http://127.0.0.1:{port}{path.decode('latin-1')}",
+            headers=[
+                (k, v)
+                for k, v in scope["headers"]
+                if k.lower() not in _HOP_BY_HOP | {b"host", b"content-length"}
+            ],
+            content=bytes(body),
+        )
+        try:
+            response = await self._get_client().send(request, stream=True)
+        except httpx.TransportError:
+            await _session_not_found(send)
+            return
+
+        async def relay() -> None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (k, v)
+                        for k, v in response.headers.raw
+                        if k.lower() not in _HOP_BY_HOP
+                    ],
+                }
+            )
+            try:
+                async for chunk in response.aiter_raw():
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            except httpx.TransportError:
+                # The owner shut down mid stream; end ours instead of failing.
+                pass
+            await send({"type": "http.response.body", "body": b""})
+
+        async def disconnected() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        relaying = asyncio.ensure_future(relay())
+        watching = asyncio.ensure_future(disconnected())
+        try:
+            await asyncio.wait(
+                {relaying, watching}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in (relaying, watching):
+                task.cancel()
+            await asyncio.gather(relaying, watching, return_exceptions=True)
+            await response.aclose()
+        if not relaying.cancelled() and relaying.exception() is not None:
+            raise relaying.exception()
+
+
+@dataclass(frozen=True)
+class WorkerOptions:
+    "How each worker builds and serves its app. Pickled into the workers."
+
+    create_server: Callable[[], tuple[SearxngClient, FastMCP]]
+    transport: str
+    path: str
+    log_level: str
+    stateless_http: bool
+    graceful_timeout: float
+    middleware: list[Middleware]
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(
+    options: WorkerOptions,
+    index: int,
+    sockets: list[socket.socket],
+    ports: list[int],
+    ready: Event,
+) -> None:
+    asyncio.run(_serve_worker(options, index, sockets, ports, ready))
+
+
+async def _serve_worker(
+    options: WorkerOptions,
+    index: int,
+    sockets: list[socket.socket],
+    ports: list[int],
+    ready: Event,
+) -> None:
+    searxng_client, mcp = options.create_server()
+    # Outermost, so forwarded requests are left to their owner's middleware.
+    middleware = (
+        options.middleware
+        if options.stateless_http
+        else [
+            Middleware(SessionAffinity, index=index, ports=ports),
+            *options.middleware,
+        ]
+    )
+    app = mcp.http_app(
+        path=options.path,
+        transport=options.transport,
+        middleware=middleware,
+        stateless_http=options.stateless_http,
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            lifespan="on",
+            log_level=options.log_level,
+            timeout_graceful_shutdown=options.graceful_timeout,
+        )
+    )
+    # Held open like in single process mode, to keep the pool warm.
+    async with searxng_client:
+        serving = asyncio.ensure_future(server.serve(sockets=sockets))
+        while not server.started and not serving.done():
+            await asyncio.sleep(0.05)
+        if server.started:
+            ready.set()
+        await serving
+
+
+class Supervisor:
+    """
+    Runs `workers` server processes and keeps them running.
+
+    The public socket is bound once here and shared by every worker, so
+    connections waiting to be accepted survive a worker restarting. Each
+    worker also listens on a loopback socket of its own, which other workers
+    forward requests for its sessions to. A worker that dies is replaced.
+    SIGHUP replaces the workers one at a time, each only once its successor
+    is serving. A successor that does not start within `start_timeout`
+    seconds is stopped and the remaining workers are kept. SIGINT or SIGTERM
+    stops them all gracefully.
+    """
+
+    start_timeout = 60.0
+
+    def __init__(self, options: WorkerOptions, workers: int, host: str, port: int):
+        self.options = options
+        self.workers = workers
+        self.socket = bind_socket(host, port)
+        self.private = [bind_socket("127.0.0.1", 0) for _ in range(workers)]
+        self.ports = [sock.getsockname()[1] for sock in self.private]
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[multiprocessing.process.BaseProcess] = []
+        self._ready: list[Event] = []
+        self._wake = threading.Event()
+        self._should_exit = False
+        self._should_restart = False
+
+    def _start(self, index: int) -> tuple[multiprocessing.process.BaseProcess, Event]:
+        ready = self._context.Event()
+        process = self._context.Process(
+            target=_run_worker,
+            args=(
+                self.options,
+                index,
+                [self.socket, self.private[index]],
+                self.ports,
+                ready,
+            ),
+            name=f"searxng-mcp-worker-{index}",
+        )
+        process.start()
+        return process, ready
+
+    def _stop(self, process: multiprocessing.process.BaseProcess) -> None:
+        process.terminate()
+        process.join(self.options.graceful_timeout + 5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _wait_ready(
+        self, process: multiprocessing.process.BaseProcess, ready: Event
+    ) -> bool:
+        deadline = time.monotonic() + self.start_timeout
+        while not ready.wait(0.1):
+            if not process.is_alive() or time.monotonic() > deadline:
+                return False
+        return True
+
+    def _signal(self, signum: int, _: Any) -> None:
+        if signum == signal.SIGHUP:
+            self._should_restart = True
+        else:
+            self._should_exit = True
+        self._wake.set()
+
+    def restart(self) -> None:
+        "Replaces every worker, starting each successor before stopping it."
+        for index, old in enumerate(self._processes):
+            process, ready = self._start(index)
+            if not self._wait_ready(process, ready):
+                # The others would most likely fail the same way.
+                logger.error(
+                    f"Worker {index} failed to start, keeping the running workers."
+                )
+                self._stop(process)
+                return
+            self._processes[index], self._ready[index] = process, ready
+            self._stop(old)
+        logger.info(f"Restarted {self.workers} workers.")
+
+    def run(self) -> None:
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(signum, self._signal)
+        started = [self._start(index) for index in range(self.workers)]
+        self._processes = [process for process, _ in started]
+        self._ready = [ready for _, ready in started]
+        host, port = self.socket.getsockname()[:2]
+        logger.info(f"Serving on http://{host}:{port} with {self.workers} workers.")
+        try:
+            while not self._should_exit:
+                self._wake.wait(0.5)
+                self._wake.clear()
+                if self._should_restart:
+                    self._should_restart = False
+                    self.restart()
+                for index, process in enumerate(self._processes):
+                    if process.is_alive() or self._should_exit:
+                        continue
+                    if not self._ready[index].is_set():
+                        # Replacing it would most likely fail the same way.
+                        logger.error(f"Worker {index} failed to start.")
+                        self._should_exit = True
+                        break
+                    logger.warning(
+                        f"Worker {index} exited with {process.exitcode}, replacing it."
+                    )
+                    self._processes[index], self._ready[index] = self._start(index)
+        finally:
+            for process in self._processes:
+                process.terminate()
+            for process in self._processes:
+                self._stop(process)
+            for sock in (self.socket, *self.private):
+                sock.close()
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from fastmcp import Client
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.autocomplete import PrefixCache, normalize_prefix, parse_suggestions
+from searxng_mcp.searxng_client import SearxngClient
+from searxng_mcp.server import create_mcp_server
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+PYTHON = ["python", "python 3", "python download", "pythonanywhere", "python list"]
+
+
+def autocompleter_url(q: str) -> URL:
+    return URL(MOCK_SEARXNG_URL + "/autocompleter", params={"q": q})
+
+
+def test_normalize_prefix():
+    assert normalize_prefix("  Py   Th") == "py th"
+    assert normalize_prefix("py ") == "py "
+
+
+def test_parse_suggestions_accepts_both_shapes():
+    assert parse_suggestions(["a", "b"]) == ["a", "b"]
+    assert parse_suggestions(["py", ["python", "pytest"]]) == ["python", "pytest"]
+    assert parse_suggestions({"error": 1}) == []
+
+
+def test_shorter_prefix_answers_longer_one():
+    cache = PrefixCache(min_suggestions=3)
+    cache.set("py", [*PYTHON, "pytest", "pypi"])
+
+    assert cache.get("pyth") == PYTHON
+    assert cache.derived_hits == 1
+    assert cache.get("pyt") == [*PYTHON, "pytest"]
+
+
+def test_longer_prefix_answers_shorter_one():
+    cache = PrefixCache(min_suggestions=3)
+    cache.set("pytho", PYTHON)
+
+    assert cache.get("pyth") == PYTHON
+
+
+def test_too_few_matching_suggestions_is_a_miss():
+    cache = PrefixCache(min_suggestions=3)
+    cache.set("py", ["pytest", "pypi", "python"])
+
+    assert cache.get("pyth") is None
+    assert cache.misses == 1
+
+
+def test_expired_entries_are_ignored(monkeypatch: pytest.MonkeyPatch):
+    now = 1000.0
+    monkeypatch.setattr("searxng_mcp.autocomplete.time.monotonic", lambda: now)
+    cache = PrefixCache(ttl=10, min_suggestions=1)
+    cache.set("py", ["python"])
+    now += 11
+
+    assert cache.get("py") is None
+    assert cache.get("pyth") is None
+
+
+def test_eviction_prunes_the_trie():
+    cache = PrefixCache(max_entries=1, min_suggestions=1)
+    cache.set("python", ["python"])
+    cache.set("ja", ["java"])
+
+    assert len(cache) == 1
+    assert cache.evictions == 1
+    assert list(cache._root.children) == ["j"]
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_only_asks_searxng_on_misses(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    httpx_mock.add_response(url=autocompleter_url("py"), text=json.dumps(PYTHON))
+
+    first = await client.autocomplete(q="Py")
+    refined = await client.autocomplete(q="pyth")
+
+    assert first.structured_content == {"query": "Py", "suggestions": PYTHON}
+    assert refined.structured_content == {"query": "pyth", "suggestions": PYTHON}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_blank_queries_suggest_nothing(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    httpx_mock.add_response(url=autocompleter_url("py"), text=json.dumps(PYTHON))
+    await client.autocomplete(q="py")
+
+    result = await client.autocomplete(q="   ")
+
+    assert result.structured_content == {"query": "   ", "suggestions": []}
+    assert len(httpx_mock.get_requests()) == 1
+    assert (client.suggestions.hits, client.suggestions.misses) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_tool_is_registered(httpx_mock: HTTPXMock):
+    mcp = create_mcp_server(SearxngClient(api_url=MOCK_SEARXNG_URL))
+    httpx_mock.add_response(
+        url=autocompleter_url("sear"), text=json.dumps(["sear", ["searxng"]])
+    )
+
+    async with Client(mcp) as client:
+        result = await client.call_tool("autocomplete", {"q": "sear"})
+
+    assert result.structured_content == {"query": "sear", "suggestions": ["searxng"]}
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from httpx import URL, AsyncClient, RequestError
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.backends import BackendPool
+from searxng_mcp.searxng_client import SearxngClient
+
+FIRST_URL = "https://first.searxng.com"
+SECOND_URL = "https://second.searxng.com"
+
+
+def test_least_outstanding_prefers_idle_backend():
+    pool = BackendPool([FIRST_URL, SECOND_URL])
+    first, second = pool.backends
+    first.outstanding = 2
+
+    assert pool.select() is second
+    assert pool.select(exclude=[second]) is first
+
+
+def test_ewma_prefers_fast_backend():
+    pool = BackendPool([FIRST_URL, SECOND_URL], strategy="ewma")
+    first, second = pool.backends
+    pool.observe(first, 0.5, ok=True)
+    pool.observe(second, 0.1, ok=True)
+
+    assert pool.select() is second
+
+
+def test_failing_backend_is_ejected_until_probe_succeeds():
+    pool = BackendPool([FIRST_URL, SECOND_URL], max_failures=2)
+    first, second = pool.backends
+    second.outstanding = 5
+
+    pool.observe(first, 0.1, ok=False)
+    assert pool.select() is first
+    pool.observe(first, 0.1, ok=False)
+
+    assert first.ejected
+    assert pool.select() is second
+
+
+@pytest.mark.asyncio
+async def test_probe_reinstates_recovered_backend(httpx_mock: HTTPXMock):
+    pool = BackendPool([FIRST_URL, SECOND_URL], max_failures=1)
+    first, _ = pool.backends
+    pool.observe(first, 0.1, ok=False)
+
+    httpx_mock.add_response(url=FIRST_URL + "/healthz", text="OK")
+    async with AsyncClient() as client:
+        await pool.probe(client)
+
+    assert not first.ejected
+
+
+@pytest.mark.asyncio
+async def test_search_fails_over_to_next_backend(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=f"{FIRST_URL},{SECOND_URL}")
+    params = {"q": "failover", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        url=URL(FIRST_URL + "/search", params=params), status_code=503
+    )
+    httpx_mock.add_response(
+        url=URL(SECOND_URL + "/search", params=params),
+        text=json.dumps({"results": [{"title": "Second"}]}),
+    )
+
+    result = await client.search(q="failover")
+
+    assert result.structured_content is not None
+    assert result.structured_content["results"][0]["title"] == "Second"
+    assert client.backends.backends[0].failures == 1
+
+
+@pytest.mark.asyncio
+async def test_search_raises_when_every_backend_fails(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=[FIRST_URL, SECOND_URL], retries=0)
+
+    def raise_request_error(request):
+        raise RequestError("Connection failed", request=request)
+
+    httpx_mock.add_callback(raise_request_error, is_reusable=True)
+
+    with pytest.raises(RequestError):
+        await client.search(q="down")
+    assert len(httpx_mock.get_requests()) == 2
@@ -0,0 +1,103 @@
+import json
+import time
+
+import pytest
+from fastmcp.exceptions import ToolError
+from httpx import URL, HTTPStatusError, RequestError
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.breaker import CircuitBreaker, CircuitOpen
+from searxng_mcp.searxng_client import SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+def test_breaker_opens_and_lets_one_trial_through(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    breaker.record(ok=False)
+    breaker.before_call()
+    breaker.record(ok=False)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.record(ok=True)
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens_breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    breaker.record(ok=False)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    breaker.before_call()
+    breaker.record(ok=False)
+    assert breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_retries_server_errors_honoring_retry_after(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, retry_backoff=0)
+    url = URL(
+        MOCK_SEARXNG_URL + "/search",
+        params={"q": "retry", "pageno": 1, "format": "json"},
+    )
+    httpx_mock.add_response(url=url, status_code=429, headers={"Retry-After": "0"})
+    httpx_mock.add_response(url=url, status_code=503)
+    httpx_mock.add_response(url=url, text=json.dumps({"results": []}))
+
+    result = await client.search(q="retry")
+
+    assert result.structured_content == {"results": []}
+    assert len(httpx_mock.get_requests()) == 3
+    assert client.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_past_the_deadline_gives_up(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, total_timeout=1.0)
+    httpx_mock.add_response(status_code=503, headers={"Retry-After": "120"})
+
+    with pytest.raises(HTTPStatusError):
+        await client.search(q="busy")
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, breaker_failures=1)
+    httpx_mock.add_response(status_code=400)
+
+    with pytest.raises(HTTPStatusError):
+        await client.search(q="bad")
+    # A bad request does not mean SearXNG is down.
+    assert client.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast(httpx_mock: HTTPXMock):
+    client = SearxngClient(
+        api_url=MOCK_SEARXNG_URL, retries=0, breaker_failures=2, breaker_reset=60
+    )
+
+    def raise_request_error(request):
+        raise RequestError("Connection failed", request=request)
+
+    httpx_mock.add_callback(raise_request_error, is_reusable=True)
+
+    for query in ("one", "two"):
+        with pytest.raises(RequestError):
+            await client.search(q=query)
+    with pytest.raises(ToolError, match="unavailable"):
+        await client.search(q="three")
+    assert len(httpx_mock.get_requests()) == 2
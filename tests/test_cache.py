@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.cache import ResultCache, canonical_key
+from searxng_mcp.searxng_client import Engines, SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+def test_canonical_key_normalizes_equivalent_queries():
+    defaults = {"pageno": 1, "format": "json"}
+    list_params = {"engines"}
+
+    a = canonical_key(
+        {"q": "  hello   world ", "engines": "google, bing", "pageno": 1},
+        defaults,
+        list_params,
+    )
+    b = canonical_key(
+        {"q": "hello world", "engines": "bing,google", "format": "json"},
+        defaults,
+        list_params,
+    )
+    c = canonical_key({"q": "hello world", "pageno": 2}, defaults, list_params)
+
+    assert a == b
+    assert a != c
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", 1, size=1, ttl=60)
+    cache.set("b", 2, size=1, ttl=60)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3, size=1, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_evicts_by_bytes():
+    cache = ResultCache(max_bytes=10)
+    cache.set("a", 1, size=6, ttl=60)
+    cache.set("b", 2, size=6, ttl=60)
+    cache.set("huge", 3, size=11, ttl=60)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("huge") is None
+    assert cache.size_bytes == 6
+
+
+def test_cache_entries_expire(monkeypatch: pytest.MonkeyPatch):
+    now = 1000.0
+    monkeypatch.setattr("searxng_mcp.cache.time.monotonic", lambda: now)
+    cache = ResultCache(ttls={"csv": 5})
+    cache.set("a", 1, size=1, ttl=cache.ttl_for("csv"))
+
+    now += 4
+    assert cache.get("a") == 1
+    now += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_is_served_from_cache(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "cached", "engines": "google, bing", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps({"results": [{"title": "Cached"}]}),
+    )
+
+    first = await client.search(q="cached", engines=[Engines.google, Engines.bing])
+    second = await client.search(
+        q=" cached ", engines=[Engines.bing, Engines.google], pageno=1
+    )
+
+    assert second is first
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_no_cache_bypasses_cached_result(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "fresh", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps({"results": []}),
+        is_reusable=True,
+    )
+
+    await client.search(q="fresh")
+    await client.search(q="fresh", no_cache=True)
+
+    assert len(httpx_mock.get_requests()) == 2
@@ -0,0 +1,142 @@
+import json
+
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.capabilities import CapabilityIndex
+from searxng_mcp.searxng_client import Categories, Engines, Plugins, SearxngClient
+from searxng_mcp.server import create_mcp_server
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+CONFIG = {
+    "version": "2025.1.1",
+    "categories": ["general", "news"],
+    "engines": [
+        {"name": "bing", "categories": ["general", "news"], "enabled": True},
+        {"name": "google", "categories": ["general"], "enabled": False},
+    ],
+    "plugins": [
+        {"name": "Hash plugin", "enabled": True},
+        {"name": "Vim-like hotkeys", "enabled": False},
+    ],
+}
+
+
+def test_index_maps_categories_to_engines():
+    index = CapabilityIndex(CONFIG)
+
+    assert index.categories == {
+        "general": {"bing": True, "google": False},
+        "news": {"bing": True},
+    }
+    assert index.engines == {"bing": True, "google": False}
+    assert index.plugins == {"Hash plugin": True, "Vim-like hotkeys": False}
+
+
+def test_unsupported_and_strip():
+    index = CapabilityIndex(CONFIG)
+    args = {
+        "q": "x",
+        "engines": "bing, google, yandex",
+        "enabled_engines": "google",
+        "categories": "news, music",
+    }
+
+    unsupported = index.unsupported(args)
+
+    # Engines disabled by default still run when named.
+    assert unsupported == {"engines": ["yandex"], "categories": ["music"]}
+    assert index.strip(args, unsupported) == {
+        "q": "x",
+        "engines": "bing, google",
+        "enabled_engines": "google",
+        "categories": "news",
+    }
+
+
+def client_with_index(**kwargs) -> SearxngClient:
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, **kwargs)
+    client.capabilities = CapabilityIndex(CONFIG)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_plugin_ids_match_config_names(httpx_mock: HTTPXMock):
+    client = client_with_index()
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={
+                "q": "x",
+                "enabled_plugins": "Hash_plugin",
+                "disabled_plugins": "Vim-like_hotkeys",
+                "pageno": 1,
+                "format": "json",
+            },
+        ),
+        text=json.dumps({"results": []}),
+    )
+
+    result = await client.search(
+        q="x",
+        enabled_plugins=[Plugins.hash_plugin, Plugins.tor_check_plugin],
+        disabled_plugins=[Plugins.vim_like_hotkeys],
+    )
+
+    [warning] = result.structured_content["_warnings"]
+    assert "enabled_plugins: Tor_check_plugin" in warning
+
+
+@pytest.mark.asyncio
+async def test_unsupported_engines_are_stripped_with_a_warning(httpx_mock: HTTPXMock):
+    client = client_with_index()
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "x", "engines": "bing", "pageno": 1, "format": "json"},
+        ),
+        text=json.dumps({"results": []}),
+    )
+
+    result = await client.search(q="x", engines=[Engines.bing, Engines.yandex])
+
+    assert result.structured_content["results"] == []
+    assert "engines: yandex" in result.structured_content["_warnings"][0]
+
+
+@pytest.mark.asyncio
+async def test_reject_policy_raises_before_searching():
+    client = client_with_index(unsupported_policy="reject")
+
+    with pytest.raises(ToolError, match="categories: music"):
+        await client.search(q="x", categories=[Categories.music])
+
+
+@pytest.mark.asyncio
+async def test_nothing_left_to_search_raises():
+    client = client_with_index()
+
+    with pytest.raises(ToolError, match="None of the requested engines"):
+        await client.search(q="x", engines=[Engines.yandex])
+
+
+@pytest.mark.asyncio
+async def test_config_is_loaded_at_startup_and_served_as_resource(
+    httpx_mock: HTTPXMock,
+):
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL, capabilities_refresh=60)
+    mcp = create_mcp_server(searxng_client)
+    httpx_mock.add_response(
+        url=MOCK_SEARXNG_URL + "/config", text=json.dumps(CONFIG), is_reusable=True
+    )
+
+    async with Client(mcp) as client:
+        contents = await client.read_resource("searxng://capabilities")
+
+    index = json.loads(contents[0].text)
+    assert index["categories"]["news"] == {"bing": True}
+    assert searxng_client.capabilities is not None
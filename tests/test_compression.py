@@ -0,0 +1,118 @@
+import gzip
+import json
+import zlib
+
+import httpx
+import pytest
+from httpx import URL
+from pytest_httpx import HTTPXMock, IteratorStream
+
+from searxng_mcp.compression import CompressionMiddleware, accept_encoding, negotiate
+from searxng_mcp.searxng_client import SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+def test_negotiate_honours_preference_and_weights():
+    encodings = ["zstd", "br", "gzip"]
+
+    assert negotiate("gzip, br", encodings) == "br"
+    assert negotiate("zstd;q=0, gzip", encodings) == "gzip"
+    assert negotiate("*", encodings) == "zstd"
+    assert negotiate("identity", encodings) is None
+    assert negotiate("", encodings) is None
+
+
+def app_sending(*chunks: bytes, content_type: bytes = b"application/json"):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type)],
+            }
+        )
+        for i, chunk in enumerate(chunks):
+            more_body = i < len(chunks) - 1
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    return app
+
+
+async def fetch(app, accept: str = "gzip") -> httpx.Response:
+    transport = httpx.ASGITransport(app=CompressionMiddleware(app, minimum_size=100))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        return await http.get("/", headers={"Accept-Encoding": accept})
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_compressed():
+    body = json.dumps({"results": ["result"] * 100}).encode()
+
+    response = await fetch(app_sending(body))
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(body)
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == body
+
+
+@pytest.mark.asyncio
+async def test_small_and_unaccepted_responses_are_left_alone():
+    small = await fetch(app_sending(b'{"results": []}'))
+    unaccepted = await fetch(app_sending(b"x" * 500), accept="identity")
+    binary = await fetch(app_sending(b"x" * 500, content_type=b"image/png"))
+
+    for response in (small, unaccepted, binary):
+        assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_are_flushed_one_by_one():
+    first, second = b"data: " + b"a" * 200 + b"\n\n", b"data: b\n\n"
+    app = CompressionMiddleware(
+        app_sending(first, second, content_type=b"text/event-stream"),
+        minimum_size=100,
+    )
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await app(scope, receive, send)
+
+    start, *bodies = sent
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    decoder = zlib.decompressobj(31)
+    # Each chunk decodes on its own, without waiting for the next.
+    assert decoder.decompress(bodies[0]["body"]) == first
+    assert decoder.decompress(bodies[1]["body"]) == second
+    assert not bodies[1]["more_body"]
+
+
+@pytest.mark.asyncio
+async def test_upstream_negotiates_and_decodes(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    document = {"results": [{"title": "Compressed"}] * 50}
+    compressed = gzip.compress(json.dumps(document).encode())
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "squeeze", "format": "json", "pageno": 1},
+        ),
+        match_headers={"Accept-Encoding": accept_encoding()},
+        stream=IteratorStream([compressed]),
+        headers={"Content-Encoding": "gzip"},
+    )
+
+    result = await client.search(q="squeeze")
+
+    assert result.structured_content == document
+    rendered = client.metrics.render()
+    assert f"searxng_mcp_upstream_wire_bytes_total {len(compressed)}" in rendered
@@ -0,0 +1,110 @@
+import json
+import time
+
+import pytest
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.engine_health import EngineHealth
+from searxng_mcp.searxng_client import Engines, SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+def failing(*engines: str) -> dict:
+    return {
+        "results": [{"title": "ok", "engine": "bing", "engines": ["bing"]}],
+        "unresponsive_engines": [[engine, "timeout"] for engine in engines],
+    }
+
+
+def test_repeatedly_failing_engine_is_disabled():
+    health = EngineHealth(threshold=3)
+    for _ in range(2):
+        health.observe(failing("google"))
+    assert health.disabled() == []
+
+    health.observe(failing("google"))
+    assert health.disabled() == ["google"]
+
+
+def test_answers_offset_failures():
+    health = EngineHealth(threshold=2)
+    health.observe(failing("google"))
+    health.observe({"results": [{"engines": ["google"]}]})
+    health.observe(failing("google"))
+    assert health.disabled() == []
+
+
+def test_cool_down_expires(monkeypatch):
+    health = EngineHealth(threshold=1, cool_down=60)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    health.observe(failing("google"))
+    assert health.disabled() == ["google"]
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert health.disabled() == []
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_engines_are_disabled_upstream(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, engine_failure_threshold=1)
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "first", "pageno": 1, "format": "json"},
+        ),
+        text=json.dumps(failing("google")),
+    )
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={
+                "q": "second",
+                "disabled_engines": "bing, google",
+                "pageno": 1,
+                "format": "json",
+            },
+        ),
+        text=json.dumps({"results": []}),
+    )
+
+    await client.search(q="first")
+    await client.search(q="second", disabled_engines=[Engines.bing])
+
+
+@pytest.mark.asyncio
+async def test_explicit_engines_are_left_alone(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, engine_failure_threshold=1)
+    client.engine_health.observe(failing("google"))
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "pinned", "engines": "google", "pageno": 1, "format": "json"},
+        ),
+        text=json.dumps({"results": []}),
+    )
+
+    await client.search(q="pinned", engines=[Engines.google])
+
+
+@pytest.mark.asyncio
+async def test_enabled_engines_are_never_disabled(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, engine_failure_threshold=1)
+    client.engine_health.observe(failing("google", "bing"))
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={
+                "q": "wanted",
+                "enabled_engines": "google",
+                "disabled_engines": "bing",
+                "pageno": 1,
+                "format": "json",
+            },
+        ),
+        text=json.dumps({"results": []}),
+    )
+
+    await client.search(q="wanted", enabled_engines=[Engines.google])
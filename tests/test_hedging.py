@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+from httpx import Request, Response
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.hedging import Hedger
+from searxng_mcp.searxng_client import SearxngClient
+
+FIRST_URL = "https://first.searxng.com"
+SECOND_URL = "https://second.searxng.com"
+
+
+def test_no_hedging_until_enough_samples():
+    hedger = Hedger(quantile=0.9, min_samples=10)
+    for latency in range(9):
+        hedger.observe(latency)
+    assert hedger.delay() is None
+
+    hedger.observe(9)
+    assert hedger.delay() == 8
+
+
+def test_budget_caps_extra_requests():
+    hedger = Hedger(max_ratio=0.25, min_samples=1)
+    hedger.observe(0.1)
+    hedges = 0
+    for _ in range(100):
+        hedger.delay()
+        if hedger.can_hedge():
+            hedger.spend()
+            hedges += 1
+    assert hedges == 25
+    assert hedger.hedges == 25
+
+
+def hedged_client() -> SearxngClient:
+    client = SearxngClient(
+        api_url=[FIRST_URL, SECOND_URL], hedge_quantile=0.9, hedge_max_ratio=1.0
+    )
+    for _ in range(client.hedger.min_samples):
+        client.hedger.observe(0.01)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_to_another_backend(httpx_mock: HTTPXMock):
+    client = hedged_client()
+    first_cancelled = asyncio.Event()
+
+    async def respond(request: Request) -> Response:
+        if request.url.host == "first.searxng.com":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                first_cancelled.set()
+                raise
+        return Response(200, text=json.dumps({"results": [{"title": "Fast"}]}))
+
+    httpx_mock.add_callback(respond, is_reusable=True)
+
+    result = await client.search(q="hedge")
+
+    assert result.structured_content["results"][0]["title"] == "Fast"
+    assert client.hedger.hedges == 1
+    assert first_cancelled.is_set()
+    assert client.limiter.in_use == 0
+    assert all(b.outstanding == 0 for b in client.backends.backends)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged(httpx_mock: HTTPXMock):
+    client = hedged_client()
+    httpx_mock.add_response(text=json.dumps({"results": []}))
+
+    await client.search(q="fast")
+
+    assert client.hedger.hedges == 0
+    assert len(httpx_mock.get_requests()) == 1
+    await client.aclose()
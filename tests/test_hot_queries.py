@@ -0,0 +1,94 @@
+import json
+import time
+
+import pytest
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.hot_queries import HotQueryTracker, RefreshScheduler
+from searxng_mcp.searxng_client import SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+def test_hottest_orders_by_request_count():
+    tracker = HotQueryTracker()
+    for key, count in (("a", 2), ("b", 5), ("c", 3), ("d", 1)):
+        for _ in range(count):
+            tracker.record(key, {"q": key})
+
+    assert [key for key, _ in tracker.hottest(2)] == ["b", "c"]
+    # A single request is not enough to count as hot.
+    assert "d" not in [key for key, _ in tracker.hottest(10)]
+
+
+def test_scores_decay_over_time(monkeypatch):
+    tracker = HotQueryTracker(half_life=10.0)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    for _ in range(4):
+        tracker.record("old", {"q": "old"})
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 30)
+    for _ in range(2):
+        tracker.record("new", {"q": "new"})
+
+    assert [key for key, _ in tracker.hottest(2, min_score=0)] == ["new", "old"]
+
+
+def test_capacity_forgets_coldest_query():
+    tracker = HotQueryTracker(capacity=2)
+    for key, count in (("a", 3), ("b", 2), ("c", 1)):
+        for _ in range(count):
+            tracker.record(key, {"q": key})
+
+    # The newcomer takes over the coldest slot and inherits its score.
+    assert len(tracker) == 2
+    assert sorted(key for key, _ in tracker.hottest(10)) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_tick_respects_budget_and_max_age():
+    tracker = HotQueryTracker()
+    for key in ("a", "b", "c"):
+        for _ in range(3):
+            tracker.record(key, {"q": key})
+    tracker.mark_fetched("a")
+    refreshed = []
+
+    async def refresh(key, args):
+        refreshed.append(key)
+        tracker.mark_fetched(key)
+
+    scheduler = RefreshScheduler(
+        tracker, refresh, max_queries=3, max_age=60.0, budget_per_minute=1
+    )
+    await scheduler.tick()
+    await scheduler.tick()
+
+    # "a" was just fetched and the budget only allows one refresh.
+    assert len(refreshed) == 1
+    assert refreshed[0] in ("b", "c")
+
+
+@pytest.mark.asyncio
+async def test_client_refreshes_hot_queries(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "hot", "pageno": 1, "format": "json"},
+        ),
+        text=json.dumps({"query": "hot", "results": []}),
+        is_reusable=True,
+    )
+    client = SearxngClient(MOCK_SEARXNG_URL, hot_queries=5, hot_query_max_age=0.0)
+
+    async with client:
+        await client.search(q="hot")
+        await client.search(q="hot")
+        assert len(httpx_mock.get_requests()) == 1
+
+        await client.refresh_scheduler.tick()
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert client.refresh_scheduler.refreshes == 1
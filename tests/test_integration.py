@@ -65,7 +65,9 @@ async def test_list_resources(streamable_http_client: Client[StreamableHttpTrans
         assert streamable_http_client.is_connected()
         resources = await streamable_http_client.list_resources()
         assert isinstance(resources, list)
-        assert len(resources) == 0
+        assert [str(resource.uri) for resource in resources] == [
+            "searxng://capabilities"
+        ]
 
 
 @pytest.mark.asyncio
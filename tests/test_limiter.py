@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+from fastmcp.exceptions import ToolError
+from httpx import Request, Response
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.limiter import AdaptiveLimiter, LimiterOverloaded
+from searxng_mcp.searxng_client import SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+@pytest.mark.asyncio
+async def test_calls_over_the_limit_wait_for_a_slot():
+    limiter = AdaptiveLimiter(initial_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queued == 1 and not waiter.done()
+
+    limiter.release()
+    await waiter
+    assert limiter.in_use == 2
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_deadline_reject():
+    limiter = AdaptiveLimiter(initial_limit=1, queue_size=1, queue_timeout=0.01)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(LimiterOverloaded):
+        await limiter.acquire()
+    with pytest.raises(LimiterOverloaded):
+        await waiter
+    assert limiter.rejected == 2
+    assert limiter.queued == 0
+    assert limiter.in_use == 1
+
+
+def test_limit_grows_when_healthy_and_shrinks_on_errors():
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=12)
+    for _ in range(100):
+        limiter.in_use += 1
+        limiter.release(0.1, ok=True)
+    assert limiter.limit == 12
+
+    limiter.in_use += 1
+    limiter.release(0.1, ok=False)
+    assert limiter.limit == pytest.approx(12 * 0.9)
+
+
+def test_latency_spike_shrinks_limit():
+    limiter = AdaptiveLimiter(initial_limit=10)
+    limiter.in_use += 2
+    limiter.release(0.1)
+    limiter.release(1.0)
+    assert limiter.limit < 10
+
+
+@pytest.mark.asyncio
+async def test_client_rejects_searches_when_overloaded(httpx_mock: HTTPXMock):
+    release = asyncio.Event()
+
+    async def slow(request: Request) -> Response:
+        await release.wait()
+        return Response(200, text=json.dumps({"results": []}))
+
+    httpx_mock.add_callback(slow, is_reusable=True)
+    client = SearxngClient(
+        MOCK_SEARXNG_URL, concurrency_limit=1, queue_size=1, queue_timeout=10.0
+    )
+
+    first = asyncio.create_task(client.search(q="one"))
+    second = asyncio.create_task(client.search(q="two"))
+    await asyncio.sleep(0.05)
+    with pytest.raises(ToolError, match="overloaded"):
+        await client.search(q="three")
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert client.limiter.in_use == 0
+    await client.aclose()
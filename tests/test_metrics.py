@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from httpx import ASGITransport, AsyncClient
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.metrics import Registry
+from searxng_mcp.searxng_client import SearxngClient
+from searxng_mcp.server import create_mcp_server
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls.", ("tool",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    calls.inc("search")
+    calls.inc("search")
+    calls.inc('say "hi"')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{tool="search"} 2' in text
+    assert r'calls_total{tool="say \"hi\""} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "latency_seconds_sum 5.55" in text
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_and_upstream_are_measured(httpx_mock: HTTPXMock):
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    mcp = create_mcp_server(searxng_client)
+    httpx_mock.add_response(text=json.dumps({"results": []}), is_reusable=True)
+
+    async with Client(mcp) as client:
+        await client.call_tool("search", {"q": "one", "categories": ["news"]})
+        await client.call_tool("search", {"q": "one", "categories": ["news"]})
+
+    text = searxng_client.metrics.render()
+    assert (
+        'searxng_mcp_tool_calls_total{tool="search",format="json",'
+        'category="news",status="ok"} 2'
+    ) in text
+    assert 'searxng_mcp_upstream_responses_total{status="200"} 1' in text
+    assert 'searxng_mcp_cache_events_total{cache="memory",event="hit"} 1' in text
+    assert "searxng_mcp_decode_seconds_count 1" in text
+    assert "searxng_mcp_tool_calls_in_flight 0" in text
+
+
+@pytest.mark.asyncio
+async def test_unknown_label_values_are_counted_as_other():
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    mcp = create_mcp_server(searxng_client)
+
+    async with Client(mcp) as client:
+        for name in ("made_up_1", "made_up_2"):
+            with pytest.raises(ToolError):
+                await client.call_tool(name, {"format": name, "categories": [name]})
+
+    text = searxng_client.metrics.render()
+    assert (
+        'searxng_mcp_tool_calls_total{tool="other",format="other",'
+        'category="other",status="error"} 2'
+    ) in text
+    assert "made_up" not in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_route_is_served_over_http():
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    app = create_mcp_server(searxng_client).http_app()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "searxng_mcp_upstream_requests_in_flight 0" in response.text
@@ -0,0 +1,359 @@
+import asyncio
+import json
+import socket
+
+import httpcore
+import httpx
+import pytest
+import uvicorn
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.page_fetcher import PageFetcher, extract_text
+from searxng_mcp.searxng_client import SearxngClient
+from searxng_mcp.server import create_mcp_server
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+PAGE = """
+<html>
+<head><title>A &amp; B</title><script>var skipped = 1;</script></head>
+<body>
+  <nav><a href="/">Home</a></nav>
+  <article>
+    <h1>Heading</h1>
+    <p>First   paragraph with <b>bold</b> text.</p>
+    <p>Second paragraph.<br>Next line.</p>
+  </article>
+  <footer>Copyright</footer>
+</body>
+</html>
+"""
+
+
+def fetcher(**kwargs) -> PageFetcher:
+    return PageFetcher(allow_private_networks=True, **kwargs)
+
+
+def test_extract_text_keeps_the_main_content():
+    title, text = extract_text(PAGE)
+
+    assert title == "A & B"
+    assert text == (
+        "Heading\nFirst paragraph with bold text.\nSecond paragraph.\nNext line."
+    )
+
+
+def test_extract_text_falls_back_to_the_body():
+    html = "<body><article>Teaser</article><div>" + "Long body. " * 20 + "</div>"
+
+    _, text = extract_text(html)
+
+    assert text.startswith("Teaser\nLong body.")
+
+
+@pytest.mark.asyncio
+async def test_unchanged_pages_are_revalidated(httpx_mock: HTTPXMock):
+    pages = fetcher()
+    httpx_mock.add_response(
+        url="https://example.com/a",
+        html=PAGE,
+        headers={"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"},
+    )
+    httpx_mock.add_response(
+        url="https://example.com/a",
+        match_headers={
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Sat, 17 Oct 2026 10:00:00 GMT",
+        },
+        status_code=304,
+    )
+
+    first = await pages.fetch("https://example.com/a")
+    second = await pages.fetch("https://example.com/a")
+    await pages.aclose()
+
+    assert second == first
+    assert first["title"] == "A & B"
+    assert (pages.fetched, pages.not_modified) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_pages_without_validators_are_not_cached(httpx_mock: HTTPXMock):
+    pages = fetcher()
+    httpx_mock.add_response(url="https://example.com/a", html=PAGE, is_reusable=True)
+
+    await pages.fetch("https://example.com/a")
+    await pages.fetch("https://example.com/a")
+    await pages.aclose()
+
+    assert len(pages.cache) == 0
+    assert "If-None-Match" not in httpx_mock.get_requests()[1].headers
+
+
+@pytest.mark.asyncio
+async def test_large_pages_are_truncated(httpx_mock: HTTPXMock):
+    pages = fetcher(max_bytes=100)
+    httpx_mock.add_response(
+        url="https://example.com/big", text="word " * 1000, headers={}
+    )
+
+    page = await pages.fetch("https://example.com/big")
+    await pages.aclose()
+
+    assert page["truncated"]
+    assert len(page["text"]) <= 100
+
+
+@pytest.mark.asyncio
+async def test_slow_pages_time_out(httpx_mock: HTTPXMock):
+    pages = fetcher(timeout=0.05)
+
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, html=PAGE)
+
+    httpx_mock.add_callback(slow, url="https://example.com/slow")
+
+    page = await pages.fetch("https://example.com/slow")
+    await pages.aclose()
+
+    assert page == {
+        "url": "https://example.com/slow",
+        "error": "Timed out after 0.05 seconds.",
+    }
+    assert pages.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_hosts_share_a_connection_limit(httpx_mock: HTTPXMock):
+    pages = fetcher(max_per_host=1)
+    running = peak = 0
+
+    async def count(request: httpx.Request) -> httpx.Response:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return httpx.Response(200, html=PAGE)
+
+    httpx_mock.add_callback(count, is_reusable=True)
+
+    await asyncio.gather(*(pages.fetch(f"https://example.com/{i}") for i in range(3)))
+    await pages.aclose()
+
+    assert peak == 1
+    assert not pages._host_slots
+
+
+@pytest.mark.asyncio
+async def test_private_addresses_are_refused(httpx_mock: HTTPXMock):
+    pages = PageFetcher()
+    # A literal public address, so no name needs resolving.
+    httpx_mock.add_response(
+        url="https://93.184.215.14/redirect",
+        status_code=302,
+        headers={"Location": "http://127.0.0.1/admin"},
+    )
+
+    direct = await pages.fetch("http://10.0.0.1/")
+    redirected = await pages.fetch("https://93.184.215.14/redirect")
+    await pages.aclose()
+
+    assert "non public address" in direct["error"]
+    assert "non public address" in redirected["error"]
+
+
+class Loopback(httpcore.AsyncNetworkBackend):
+    "Records the addresses connected to and connects to loopback instead."
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend):
+        self.backend = backend
+        self.addresses: list[str] = []
+
+    async def connect_tcp(self, host, port, *args, **kwargs):
+        self.addresses.append(host)
+        return await self.backend.connect_tcp("127.0.0.1", port, *args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_connections_are_pinned_to_the_checked_address(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    requests = []
+
+    async def site(scope, receive, send):
+        headers = dict(scope["headers"])
+        requests.append((scope["client"][1], headers[b"host"], headers.get(b"cookie")))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/html"),
+                    (b"set-cookie", b"session=secret"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": PAGE.encode()})
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(site, lifespan="off", log_level="warning"))
+    serving = asyncio.ensure_future(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    # Two sites on one address, which the name would resolve differently later.
+    async def getaddrinfo(host, port, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.215.14", port))]
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    pages = PageFetcher()
+    pinned = pages._get_http_client()._transport._pool._network_backend
+    pinned.backend = network = Loopback(pinned.backend)
+    try:
+        first = await pages.fetch(f"http://a.example:{port}/")
+        second = await pages.fetch(f"http://b.example:{port}/")
+    finally:
+        await pages.aclose()
+        server.should_exit = True
+        await serving
+        sock.close()
+
+    assert first["title"] == second["title"] == "A & B"
+    assert network.addresses == ["93.184.215.14", "93.184.215.14"]
+    [(a_client, a_host, _), (b_client, b_host, b_cookie)] = requests
+    # Neither the connection nor the cookies of one site go to the other.
+    assert a_client != b_client
+    assert (a_host, b_host) == (
+        f"a.example:{port}".encode(),
+        f"b.example:{port}".encode(),
+    )
+    assert b_cookie is None
+
+
+@pytest.mark.asyncio
+async def test_redirects_count_against_the_target_host(httpx_mock: HTTPXMock):
+    pages = fetcher(max_per_host=1)
+    running: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def serve(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "short.example":
+            return httpx.Response(302, headers={"Location": "https://b.example/x"})
+        running["b"] = running.get("b", 0) + 1
+        peak["b"] = max(peak.get("b", 0), running["b"])
+        await asyncio.sleep(0.01)
+        running["b"] -= 1
+        return httpx.Response(200, html=PAGE)
+
+    httpx_mock.add_callback(serve, is_reusable=True)
+
+    await asyncio.gather(
+        pages.fetch("https://short.example/a"), pages.fetch("https://b.example/y")
+    )
+    await pages.aclose()
+
+    assert peak["b"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_charsets_fall_back_to_utf8(httpx_mock: HTTPXMock):
+    pages = fetcher()
+    httpx_mock.add_response(
+        url="https://example.com/odd",
+        content="<title>Café</title>".encode(),
+        headers={"Content-Type": "text/html; charset=x-no-such-charset"},
+    )
+
+    page = await pages.fetch("https://example.com/odd")
+    await pages.aclose()
+
+    assert page["title"] == "Café"
+
+
+@pytest.mark.asyncio
+async def test_unexpected_errors_only_fail_their_page(
+    httpx_mock: HTTPXMock, monkeypatch: pytest.MonkeyPatch
+):
+    pages = fetcher()
+
+    def broken(html: str) -> tuple[str, str]:
+        raise RuntimeError("parser bug")
+
+    monkeypatch.setattr("searxng_mcp.page_fetcher.extract_text", broken)
+    httpx_mock.add_response(url="https://example.com/a", html=PAGE)
+
+    page = await pages.fetch("https://example.com/a")
+    await pages.aclose()
+
+    assert page == {"url": "https://example.com/a", "error": "RuntimeError: parser bug"}
+
+
+@pytest.mark.asyncio
+async def test_binary_pages_are_rejected(httpx_mock: HTTPXMock):
+    pages = fetcher()
+    httpx_mock.add_response(
+        url="https://example.com/a.pdf",
+        content=b"%PDF",
+        headers={"Content-Type": "application/pdf"},
+    )
+
+    page = await pages.fetch("https://example.com/a.pdf")
+    await pages.aclose()
+
+    assert page["error"] == "Not a text page: application/pdf."
+
+
+@pytest.mark.asyncio
+async def test_search_and_fetch_returns_results_with_pages(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, fetch_private_networks=True)
+    document = {
+        "results": [
+            {"title": "A", "url": "https://example.com/a"},
+            {"title": "B", "url": "https://example.com/b"},
+            {"title": "C", "url": "https://example.com/c"},
+        ]
+    }
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "pages", "format": "json", "pageno": 1},
+        ),
+        text=json.dumps(document),
+    )
+    httpx_mock.add_response(url="https://example.com/a", html=PAGE)
+    httpx_mock.add_response(url="https://example.com/b", status_code=500)
+
+    mcp = create_mcp_server(client)
+    async with Client(mcp) as mcp_client:
+        result = await mcp_client.call_tool(
+            "search_and_fetch", {"q": "pages", "top_k": 2, "max_page_chars": 7}
+        )
+
+    content = result.structured_content
+    assert content["results"] == document["results"]
+    assert content["pages"][0] == {
+        "url": "https://example.com/a",
+        "title": "A & B",
+        "text": "Heading",
+        "truncated": True,
+    }
+    assert content["pages"][1]["url"] == "https://example.com/b"
+    assert "500" in content["pages"][1]["error"]
+    assert 'searxng_mcp_page_fetches_total{result="failed"} 1' in (
+        client.metrics.render()
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_and_fetch_caps_top_k():
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, fetch_max_pages=2)
+
+    with pytest.raises(ToolError):
+        await client.search_and_fetch(q="pages", top_k=3)
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.searxng_client import SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+def page_url(pageno: int) -> URL:
+    params = {"q": "deep", "format": "json", "pageno": pageno}
+    return URL(MOCK_SEARXNG_URL + "/search", params=params)
+
+
+def page(*urls: str) -> str:
+    return json.dumps(
+        {"query": "deep", "results": [{"url": url, "title": url} for url in urls]}
+    )
+
+
+@pytest.mark.asyncio
+async def test_pages_are_merged_without_duplicates(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    httpx_mock.add_response(url=page_url(1), text=page("https://a", "https://b"))
+    httpx_mock.add_response(url=page_url(2), text=page("https://b", "https://c"))
+    httpx_mock.add_response(url=page_url(3), text=page("https://d"))
+
+    result = await client.search(q="deep", pages=3)
+
+    assert result.structured_content is not None
+    assert result.structured_content["query"] == "deep"
+    assert [r["url"] for r in result.structured_content["results"]] == [
+        "https://a",
+        "https://b",
+        "https://c",
+        "https://d",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pagination_stops_when_no_new_results(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, page_concurrency=2)
+    httpx_mock.add_response(url=page_url(1), text=page("https://a"))
+    httpx_mock.add_response(url=page_url(2), text=page("https://a"))
+
+    result = await client.search(q="deep", pages=6)
+
+    assert result.structured_content is not None
+    assert len(result.structured_content["results"]) == 1
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_pagination_stops_at_max_results(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, page_concurrency=1)
+    httpx_mock.add_response(url=page_url(1), text=page("https://a", "https://b"))
+    httpx_mock.add_response(url=page_url(2), text=page("https://c", "https://d"))
+
+    result = await client.search(q="deep", pages=5, max_results=3)
+
+    assert result.structured_content is not None
+    assert len(result.structured_content["results"]) == 3
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_pages_are_merged_before_rendering(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    httpx_mock.add_response(url=page_url(1), text=page("https://a"))
+    httpx_mock.add_response(url=page_url(2), text=page("https://b"))
+
+    result = await client.search(q="deep", format="csv", pages=2)
+
+    assert result.structured_content is not None
+    csv = result.structured_content["results"]
+    assert "https://a" in csv and "https://b" in csv
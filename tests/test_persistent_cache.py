@@ -0,0 +1,103 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.persistent_cache import PersistentCache
+from searxng_mcp.searxng_client import SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+PARAMS = {"q": "persisted", "format": "json", "pageno": 1}
+
+
+def test_entries_survive_reopening(tmp_path: Path):
+    path = tmp_path / "cache.sqlite3"
+    PersistentCache(path).set_sync("key", {"results": [1, 2]}, ttl=60)
+
+    entry = PersistentCache(path).get_sync("key")
+
+    assert entry is not None
+    assert entry.document == {"results": [1, 2]}
+    assert not entry.stale
+
+
+def test_expired_entries_are_stale_then_gone(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    now = 1000.0
+    monkeypatch.setattr("searxng_mcp.persistent_cache.time.time", lambda: now)
+    cache = PersistentCache(tmp_path / "cache.sqlite3", stale_ttl=10)
+    cache.set_sync("key", {"results": []}, ttl=5)
+
+    now += 6
+    entry = cache.get_sync("key")
+    assert entry is not None and entry.stale
+
+    now += 10
+    assert cache.get_sync("key") is None
+
+
+@pytest.mark.asyncio
+async def test_other_process_reuses_persisted_result(
+    tmp_path: Path, httpx_mock: HTTPXMock
+):
+    path = str(tmp_path / "cache.sqlite3")
+    httpx_mock.add_response(
+        url=URL(MOCK_SEARXNG_URL + "/search", params=PARAMS),
+        text=json.dumps({"results": [{"title": "Persisted"}]}),
+    )
+
+    writer = SearxngClient(api_url=MOCK_SEARXNG_URL, persistent_cache_path=path)
+    await writer.search(q="persisted")
+    await asyncio.gather(*writer._background)
+
+    reader = SearxngClient(api_url=MOCK_SEARXNG_URL, persistent_cache_path=path)
+    result = await reader.search(q="persisted")
+
+    assert result.structured_content == {"results": [{"title": "Persisted"}]}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_result_is_served_and_refreshed(
+    tmp_path: Path, httpx_mock: HTTPXMock, monkeypatch: pytest.MonkeyPatch
+):
+    now = 1000.0
+    monkeypatch.setattr("searxng_mcp.persistent_cache.time.time", lambda: now)
+    path = str(tmp_path / "cache.sqlite3")
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, persistent_cache_path=path)
+    assert client.persistent_cache is not None
+    key = client._encode_args.key({"q": "persisted", "pageno": 1})
+    client.persistent_cache.set_sync(key, {"results": ["old"]}, ttl=5)
+    now += 6
+
+    httpx_mock.add_response(
+        url=URL(MOCK_SEARXNG_URL + "/search", params=PARAMS),
+        text=json.dumps({"results": ["new"]}),
+    )
+
+    stale = await client.search(q="persisted")
+    assert stale.structured_content == {"results": ["old"]}
+
+    while client._background:
+        await asyncio.gather(*client._background)
+    fresh = await client.search(q="persisted")
+    assert fresh.structured_content == {"results": ["new"]}
+    assert client.persistent_cache.get_sync(key).document == {"results": ["new"]}
+
+
+@pytest.mark.asyncio
+async def test_client_closes_and_reopens_the_database(tmp_path: Path):
+    path = str(tmp_path / "cache.sqlite3")
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, persistent_cache_path=path)
+    await client.persistent_cache.set("key", {"results": []}, ttl=60)
+
+    async with client:
+        pass
+
+    assert client.persistent_cache._db is None
+    entry = await client.persistent_cache.get("key")
+    assert entry is not None and entry.document == {"results": []}
@@ -0,0 +1,75 @@
+import csv
+import io
+import xml.etree.ElementTree as ET
+
+from searxng_mcp.renderers import render, render_csv
+
+DOCUMENT = {
+    "query": "tea <&> biscuits",
+    "number_of_results": 42,
+    "results": [
+        {
+            "title": 'Tea, "properly"',
+            "url": "https://tea.example/brew?a=1&b=2",
+            "content": "Milk first?",
+            "engines": ["bing", "google"],
+            "score": 1.5,
+            "publishedDate": "2024-05-01T10:00:00+00:00",
+        },
+        {"title": "Biscuits", "url": "https://biscuits.example", "engine": "ddg"},
+    ],
+    "answers": ["42"],
+    "suggestions": ["tea cakes"],
+    "corrections": [],
+}
+
+
+def test_csv_matches_searxng_columns():
+    rows = list(csv.reader(io.StringIO(render("csv", DOCUMENT))))
+
+    assert rows[0] == ["title", "url", "content", "host", "engine", "score", "type"]
+    assert rows[1] == [
+        'Tea, "properly"',
+        "https://tea.example/brew?a=1&b=2",
+        "Milk first?",
+        "tea.example",
+        "bing, google",
+        "1.5",
+        "result",
+    ]
+    assert rows[2][3:5] == ["biscuits.example", "ddg"]
+    assert rows[3] == ["42", "", "", "", "", "", "answer"]
+    assert rows[4] == ["tea cakes", "", "", "", "", "", "suggestion"]
+
+
+def test_csv_streams_one_row_at_a_time():
+    chunks = list(render_csv(DOCUMENT))
+
+    assert len(chunks) == 5
+    assert all(chunk.endswith("\r\n") for chunk in chunks)
+
+
+def test_rss_is_well_formed_and_escaped():
+    channel = ET.fromstring(render("rss", DOCUMENT)).find("channel")
+
+    assert channel.findtext("title") == "SearXNG search: tea <&> biscuits"
+    items = channel.findall("item")
+    assert [item.findtext("link") for item in items] == [
+        "https://tea.example/brew?a=1&b=2",
+        "https://biscuits.example",
+    ]
+    assert items[0].findtext("pubDate") == "Wed, 01 May 2024 10:00:00 +0000"
+    assert items[1].find("pubDate") is None
+
+
+def test_html_escapes_results():
+    html = render("html", DOCUMENT)
+
+    assert "<title>tea &lt;&amp;&gt; biscuits - SearXNG</title>" in html
+    assert 'href="https://tea.example/brew?a=1&amp;b=2"' in html
+    assert '<div class="answer">42</div>' in html
+    assert "<li>tea cakes</li>" in html
+
+
+def test_unknown_format_has_no_renderer():
+    assert render("json", DOCUMENT) is None
@@ -1,12 +1,20 @@
 import json
+import threading
 
 import pytest
+from fastmcp.exceptions import ToolError
 from fastmcp.tools.tool import ToolResult
 from httpx import URL, HTTPStatusError, RequestError
 from mcp.types import TextContent
-from pytest_httpx import HTTPXMock
+from pytest_httpx import HTTPXMock, IteratorStream
 
-from searxng_mcp.searxng_client import Categories, Engines, Plugins, SearxngClient
+from searxng_mcp.searxng_client import (
+    Categories,
+    Engines,
+    Plugins,
+    SearxngClient,
+    _to_result,
+)
 
 MOCK_SEARXNG_URL = "https://mocksearxng.com"
 
@@ -87,88 +95,128 @@ async def test_minimal_parameters_only(httpx_mock: HTTPXMock):
     assert result.structured_content["results"][0]["title"] == "Minimal"
 
 
+RENDERED = {
+    "query": "naruto",
+    "results": [
+        {
+            "title": "Naruto & friends",
+            "url": "https://example.com/naruto",
+            "content": "Ninjas",
+            "engine": "bing",
+        }
+    ],
+}
+
+
 @pytest.mark.asyncio
-async def test_html_fallback_format(httpx_mock: HTTPXMock):
+async def test_html_format_is_rendered_locally(httpx_mock: HTTPXMock):
     client = SearxngClient(api_url=MOCK_SEARXNG_URL)
-
-    params = {"q": "fallback test", "format": "html", "pageno": 1}
-    html_content = "<html><body><h1>Test</h1></body></html>"
+    params = {"q": "naruto", "format": "json", "pageno": 1}
 
     httpx_mock.add_response(
         method="GET",
         url=URL(MOCK_SEARXNG_URL + "/search", params=params),
-        text=html_content,
-        headers={"Content-Type": "text/html"},
+        text=json.dumps(RENDERED),
     )
 
-    result = await client.search(q="fallback test", format="html")
+    result = await client.search(q="naruto", format="html")
     assert isinstance(result, ToolResult)
     if result.structured_content is None:
         pytest.fail("Structure content is None.")
 
-    assert "results" in result.structured_content
-    assert result.structured_content["results"] == html_content
+    html = result.structured_content["results"]
+    assert '<a href="https://example.com/naruto">Naruto &amp; friends</a>' in html
 
 
 @pytest.mark.asyncio
 async def test_csv_format(httpx_mock: HTTPXMock):
     client = SearxngClient(api_url=MOCK_SEARXNG_URL)
-    params = {"q": "some csv query", "format": "csv", "pageno": 1}
+    params = {"q": "naruto", "format": "json", "pageno": 1}
 
-    csv_data = "title,url\nExample Title,https://example.com\n"
     httpx_mock.add_response(
         method="GET",
         url=URL(MOCK_SEARXNG_URL + "/search", params=params),
-        text=csv_data,
-        headers={"Content-Type": "text/html"},
+        text=json.dumps(RENDERED),
     )
 
-    result = await client.search(q="some csv query", format="csv")
+    result = await client.search(q="naruto", format="csv")
 
     assert isinstance(result, ToolResult)
     if result.structured_content is None:
         pytest.fail("Structure content is None.")
 
-    assert "results" in result.structured_content
-    assert result.structured_content["results"] == csv_data
+    assert result.structured_content["results"] == (
+        "title,url,content,host,engine,score,type\r\n"
+        "Naruto & friends,https://example.com/naruto,Ninjas,"
+        "example.com,bing,,result\r\n"
+    )
 
 
 @pytest.mark.asyncio
 async def test_rss_format(httpx_mock: HTTPXMock):
     client = SearxngClient(api_url=MOCK_SEARXNG_URL)
-    params = {"q": "some rss query", "format": "rss", "pageno": 1}
-
-    rss_data = """<?xml version="1.0" encoding="UTF-8"?>\n<?xml-stylesheet href="/rss.xsl" type="text/xsl"?>\n<rss version="2.0"\n     xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"\n     xmlns:atom="http://www.w3.org/2005/Atom">\n  <channel>\n    <title>SearXNG search: naruto</title>\n      <description>Ninjas</description>\n    </item>\n  </channel>\n</rss>"""
+    params = {"q": "naruto", "format": "json", "pageno": 1}
 
     httpx_mock.add_response(
         method="GET",
         url=URL(MOCK_SEARXNG_URL + "/search", params=params),
-        text=rss_data,
-        headers={"Content-Type": "text/html"},
+        text=json.dumps(RENDERED),
     )
 
-    result = await client.search(q="some rss query", format="rss")
+    result = await client.search(q="naruto", format="rss")
 
     assert isinstance(result, ToolResult)
     if result.structured_content is None:
         pytest.fail("Structure content is None.")
 
-    assert "results" in result.structured_content
-    assert result.structured_content["results"] == rss_data
+    rss = result.structured_content["results"]
+    assert rss.startswith('<?xml version="1.0" encoding="UTF-8"?>')
+    assert "<title>SearXNG search: naruto</title>" in rss
+    assert "<link>https://example.com/naruto</link>" in rss
 
 
 @pytest.mark.asyncio
-async def test_invalid_format_gracefully_fallback(httpx_mock: HTTPXMock):
+async def test_formats_share_one_upstream_search(httpx_mock: HTTPXMock):
     client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "naruto", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps(RENDERED),
+    )
+
+    for format in ("json", "csv", "rss", "html"):
+        await client.search(q="naruto", format=format)
+    assert len(httpx_mock.get_requests()) == 1
 
-    fallback_text = "some text fallback from API"
-    params = {"q": "weird format", "format": "weird", "pageno": 1}
+
+@pytest.mark.asyncio
+async def test_trimming_applies_before_rendering(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "naruto", "format": "json", "pageno": 1}
+    document = {**RENDERED, "results": RENDERED["results"] * 3}
 
     httpx_mock.add_response(
         method="GET",
         url=URL(MOCK_SEARXNG_URL + "/search", params=params),
-        text=fallback_text,
-        headers={"Content-Type": "text/html"},
+        text=json.dumps(document),
+    )
+
+    result = await client.search(q="naruto", format="csv", max_results=2)
+    assert result.structured_content is not None
+    assert result.structured_content["results"].count(",result\r\n") == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_format_gracefully_fallback(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "weird format", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps(RENDERED),
     )
 
     result = await client.search(
@@ -177,7 +225,7 @@ async def test_invalid_format_gracefully_fallback(httpx_mock: HTTPXMock):
     )
     assert isinstance(result, ToolResult)
     assert isinstance(result.content[0], TextContent)
-    assert fallback_text in result.content[0].text
+    assert "Naruto & friends" in result.content[0].text
 
 
 @pytest.mark.asyncio
@@ -203,7 +251,83 @@ async def test_network_error(httpx_mock: HTTPXMock):
     def raise_request_error(request):
         raise RequestError("Connection failed", request=request)
 
-    httpx_mock.add_callback(raise_request_error)
+    httpx_mock.add_callback(raise_request_error, is_reusable=True)
 
     with pytest.raises(RequestError):
         await client.search(q="timeout test", format="json")
+    # Connection errors are retried before giving up.
+    assert len(httpx_mock.get_requests()) == 1 + client.retries
+
+
+@pytest.mark.asyncio
+async def test_oversized_response_is_aborted(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, max_response_bytes=64)
+    params = {"q": "huge", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        stream=IteratorStream([b"x" * 50, b"x" * 50]),
+    )
+
+    with pytest.raises(ToolError, match="larger than 64 bytes"):
+        await client.search(q="huge", format="html")
+
+
+@pytest.mark.asyncio
+async def test_declared_oversized_response_is_rejected(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, max_response_bytes=64)
+    params = {"q": "huge", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps({"results": ["x" * 100]}),
+    )
+
+    with pytest.raises(ToolError, match="larger than 64 bytes"):
+        await client.search(q="huge", format="json")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("threshold, threaded", [(0, True), (1 << 20, False)])
+async def test_large_json_is_decoded_off_the_event_loop(
+    httpx_mock: HTTPXMock,
+    monkeypatch: pytest.MonkeyPatch,
+    threshold: int,
+    threaded: bool,
+):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, thread_decode_bytes=threshold)
+    params = {"q": "threaded", "format": "json", "pageno": 1}
+    data = {"results": [{"title": "Threaded", "url": "https://thread.example"}]}
+    decoded_on = []
+
+    def to_result(body: bytes) -> ToolResult:
+        decoded_on.append(threading.get_ident())
+        return _to_result(body)
+
+    monkeypatch.setattr("searxng_mcp.searxng_client._to_result", to_result)
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps(data),
+    )
+
+    result = await client.search(q="threaded", format="json")
+    assert result.structured_content == data
+    assert (decoded_on != [threading.get_ident()]) is threaded
+
+
+@pytest.mark.asyncio
+async def test_invalid_json_raises_tool_error(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "broken", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text="<html>not json</html>",
+    )
+
+    with pytest.raises(ToolError, match="invalid json"):
+        await client.search(q="broken", format="json")
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.searxng_client import SearxngClient
+from searxng_mcp.server import create_mcp_server
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+@pytest.mark.asyncio
+async def test_lifespan_shares_one_pooled_client(httpx_mock: HTTPXMock):
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    mcp = create_mcp_server(searxng_client)
+    params = {"q": "pooled", "format": "json", "pageno": 1}
+
+    httpx_mock.add_response(
+        method="GET",
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps({"results": []}),
+        is_reusable=True,
+    )
+
+    async with Client(mcp) as client:
+        await client.call_tool("search", {"q": "pooled"})
+        http_client = searxng_client._http_client
+        assert http_client is not None
+
+        await client.call_tool("search", {"q": "pooled"})
+        assert searxng_client._http_client is http_client
+
+    assert searxng_client._http_client is None
+    assert http_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_nested_users_keep_client_open():
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+
+    async with searxng_client:
+        async with searxng_client:
+            http_client = searxng_client._http_client
+        assert searxng_client._http_client is http_client
+        assert http_client is not None and not http_client.is_closed
+
+    assert http_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_search_many_returns_results_and_errors(httpx_mock: HTTPXMock):
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    mcp = create_mcp_server(searxng_client)
+
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "a", "format": "json", "pageno": 1},
+        ),
+        text=json.dumps({"results": [{"title": "A"}]}),
+    )
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "b", "format": "json", "pageno": 2},
+        ),
+        text=json.dumps({"results": []}),
+    )
+    httpx_mock.add_response(
+        url=URL(
+            MOCK_SEARXNG_URL + "/search",
+            params={"q": "c", "format": "json", "pageno": 1},
+        ),
+        status_code=404,
+    )
+
+    async with Client(mcp) as client:
+        result = await client.call_tool(
+            "search_many",
+            {
+                "queries": [
+                    {"q": "a"},
+                    {"q": "b", "format": "csv", "pageno": 2},
+                    {"q": "c"},
+                ],
+                "max_concurrency": 2,
+            },
+        )
+
+    a, b, c = result.structured_content["results"]
+    assert a["result"]["results"][0]["title"] == "A"
+    assert b["result"]["results"] == "title,url,content,host,engine,score,type\r\n"
+    assert c["q"] == "c" and "404" in c["error"]
+
+
+@pytest.mark.asyncio
+async def test_search_many_rejects_oversized_batches():
+    searxng_client = SearxngClient(api_url=MOCK_SEARXNG_URL, batch_max_queries=1)
+
+    with pytest.raises(ToolError):
+        await searxng_client.search_many(
+            [SearxngClient.SearchQuery(q="a"), SearxngClient.SearchQuery(q="b")]
+        )
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from httpx import URL
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.searxng_client import SearxngClient
+from searxng_mcp.shaping import shape_document
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+DOCUMENT = {
+    "query": "shape",
+    "results": [
+        {
+            "url": f"https://example.com/{'x' * 40}/{i}",
+            "title": f"Result {i}",
+            "content": "lorem ipsum " * 20,
+            "thumbnail": "https://example.com/thumb.png",
+        }
+        for i in range(10)
+    ],
+    "infoboxes": [{"infobox": "Shape", "content": "a" * 500}],
+    "suggestions": ["shapes"],
+}
+
+
+def encoded_size(document: dict) -> int:
+    return len(json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def test_projection_and_result_limit():
+    shaped = shape_document(
+        DOCUMENT,
+        fields=["results", "suggestions"],
+        result_fields=["url", "title"],
+        max_results=3,
+    )
+
+    assert set(shaped) == {"results", "suggestions"}
+    assert len(shaped["results"]) == 3
+    assert set(shaped["results"][0]) == {"url", "title"}
+    assert len(DOCUMENT["results"]) == 10
+
+
+def test_long_text_is_truncated_but_urls_are_kept():
+    shaped = shape_document(DOCUMENT, max_text_length=10)
+    result = shaped["results"][0]
+
+    assert result["content"] == "lorem ips…"
+    assert result["url"] == DOCUMENT["results"][0]["url"]
+    assert shaped["infoboxes"][0]["content"] == "a" * 9 + "…"
+
+
+def test_byte_budget_drops_trailing_results():
+    shaped = shape_document(DOCUMENT, max_bytes=1500)
+
+    assert encoded_size(shaped) <= 1500
+    assert shaped["truncated"] is True
+    assert 0 < len(shaped["results"]) < 10
+    assert shaped["results"][0] == DOCUMENT["results"][0]
+    assert "infoboxes" not in shaped
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("format", ["json", "html", "csv", "rss"])
+async def test_byte_budget_applies_to_the_rendered_output(
+    httpx_mock: HTTPXMock, format: str
+):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "shape", "format": "json", "pageno": 1}
+    httpx_mock.add_response(
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps(DOCUMENT),
+    )
+
+    result = await client.search(q="shape", format=format, max_bytes=1500)
+
+    assert encoded_size(result.structured_content) <= 1500
+    assert result.structured_content["truncated"] is True
+    assert "Result 0" in json.dumps(result.structured_content)
+
+
+@pytest.mark.asyncio
+async def test_search_shapes_structured_content(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    params = {"q": "shape", "format": "json", "pageno": 1}
+    httpx_mock.add_response(
+        url=URL(MOCK_SEARXNG_URL + "/search", params=params),
+        text=json.dumps(DOCUMENT),
+    )
+
+    result = await client.search(
+        q="shape", fields=["results"], result_fields=["title"], max_results=2
+    )
+
+    assert result.structured_content == {
+        "results": [{"title": "Result 0"}, {"title": "Result 1"}]
+    }
+    assert result.content[0].text == json.dumps(
+        result.structured_content, separators=(",", ":")
+    )
@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+from httpx import Request, Response
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.searxng_client import SearxngClient
+from searxng_mcp.singleflight import SingleFlight
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [42] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight: SingleFlight[int] = SingleFlight()
+
+    async def work() -> int:
+        await asyncio.sleep(0)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(
+        flight.do("key", work), flight.do("key", work), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_others():
+    flight: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def work() -> int:
+        await release.wait()
+        return 1
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == 1
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_shared_call_cancelled_when_all_waiters_leave():
+    flight: SingleFlight[int] = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work() -> int:
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 1
+
+    waiter = asyncio.create_task(flight.do("key", work))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_identical_searches_share_one_upstream_request(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+
+    async def respond(request: Request) -> Response:
+        await asyncio.sleep(0.01)
+        return Response(200, text=json.dumps({"results": [{"title": "Shared"}]}))
+
+    httpx_mock.add_callback(respond)
+
+    results = await asyncio.gather(*(client.search(q="burst") for _ in range(5)))
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,70 @@
+import json
+from contextlib import contextmanager
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from searxng_mcp.searxng_client import SearxngClient
+
+MOCK_SEARXNG_URL = "https://mocksearxng.com"
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans: list[str] = []
+
+    @contextmanager
+    def start_as_current_span(self, name, **kwargs):
+        self.spans.append(name)
+        yield
+
+
+@pytest.mark.asyncio
+async def test_timing_block_breaks_down_phases(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    httpx_mock.add_response(text=json.dumps({"results": [{"title": "Timed"}]}))
+
+    result = await client.search(q="timed", timing=True, max_results=1)
+
+    timing = result.structured_content["_timing"]
+    for phase in ("parse_args", "queue", "decode", "shape", "serialize", "total"):
+        assert phase in timing
+    assert timing["total"] >= timing["decode"]
+    assert result.structured_content["results"] == [{"title": "Timed"}]
+
+
+@pytest.mark.asyncio
+async def test_timing_is_not_cached(httpx_mock: HTTPXMock):
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL)
+    httpx_mock.add_response(text=json.dumps({"results": []}))
+
+    await client.search(q="cached", timing=True)
+    result = await client.search(q="cached")
+
+    assert "_timing" not in result.structured_content
+
+
+@pytest.mark.asyncio
+async def test_sampled_searches_reach_the_tracer(httpx_mock: HTTPXMock):
+    tracer = RecordingTracer()
+    client = SearxngClient(
+        api_url=MOCK_SEARXNG_URL, tracer=tracer, trace_sample_rate=1.0
+    )
+    httpx_mock.add_response(text=json.dumps({"results": []}))
+
+    result = await client.search(q="sampled")
+
+    assert tracer.spans[0] == "searxng.search"
+    assert "searxng.decode" in tracer.spans
+    assert "_timing" not in result.structured_content
+
+
+@pytest.mark.asyncio
+async def test_unsampled_searches_are_not_traced(httpx_mock: HTTPXMock):
+    tracer = RecordingTracer()
+    client = SearxngClient(api_url=MOCK_SEARXNG_URL, tracer=tracer)
+    httpx_mock.add_response(text=json.dumps({"results": []}))
+
+    await client.search(q="unsampled")
+
+    assert tracer.spans == []
@@ -1,7 +1,7 @@
 import pytest
 from fastmcp.exceptions import ToolError
 
-from searxng_mcp.searxng_client import Engines, parse_args
+from searxng_mcp.searxng_client import ArgsEncoder, Engines, _encoder, parse_args
 
 
 def test_parse_args_required_field_missing():
@@ -31,3 +31,70 @@ def test_parse_args_optional_empty_skipped():
     result = parse_args(dummy_func, raw)
 
     assert result == {"a": 42}
+
+
+def test_args_encoder_plan():
+    def dummy_func(
+        q: str,
+        engines: list[Engines] | None = None,
+        pageno: int = 1,
+        skip: bool = False,
+    ):
+        pass
+
+    raw = {"q": "hello", "engines": [Engines.google, Engines.bing], "pageno": 2}
+    encoder = ArgsEncoder(dummy_func, exclude={"skip"})
+
+    assert encoder(raw) == {"q": "hello", "engines": "google, bing", "pageno": 2}
+    assert encoder.list_params == {"engines"}
+    assert encoder.defaults == {"engines": None, "pageno": 1}
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        # Outputs of `parse_args` before it was compiled into a plan.
+        ({"q": "a"}, {"q": "a"}),
+        ({"q": "a", "pageno": 3, "skip": True}, {"q": "a", "pageno": 3}),
+        ({"q": "a", "engines": [], "language": ""}, {"q": "a"}),
+        (
+            {"q": "a", "engines": [Engines.bing, Engines.google], "language": "en"},
+            {"q": "a", "engines": "bing, google", "language": "en"},
+        ),
+    ],
+)
+def test_parse_args_expected_pairs(raw: dict, expected: dict):
+    def dummy_func(
+        q: str,
+        engines: list[Engines] | None = None,
+        language: str | None = None,
+        pageno: int = 1,
+        skip: bool = False,
+    ):
+        pass
+
+    assert parse_args(dummy_func, raw, exclude={"skip"}) == expected
+
+
+def test_parse_args_reuses_one_plan_per_function():
+    class Searcher:
+        def search(self, q: str, pageno: int = 1):
+            pass
+
+    first, second = Searcher(), Searcher()
+    _encoder.cache_clear()
+
+    assert parse_args(first.search, {"q": "a"}) == {"q": "a"}
+    assert parse_args(second.search, {"q": "b", "pageno": 2}) == {"q": "b", "pageno": 2}
+    assert _encoder.cache_info().misses == 1
+
+
+def test_args_encoder_key_ignores_defaults_and_list_order():
+    def dummy_func(q: str, engines: list[Engines] | None = None, pageno: int = 1):
+        pass
+
+    encoder = ArgsEncoder(dummy_func)
+
+    assert encoder.key(
+        encoder({"q": "a", "engines": [Engines.bing, Engines.google], "pageno": 1})
+    ) == encoder.key(encoder({"q": "a", "engines": [Engines.google, Engines.bing]}))
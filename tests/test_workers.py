@@ -0,0 +1,138 @@
+import asyncio
+import multiprocessing
+import os
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+from searxng_mcp.workers import (
+    SessionAffinity,
+    Supervisor,
+    WorkerOptions,
+    bind_socket,
+)
+
+
+async def echo_session(scope, receive, send):
+    "Reports the session id it received and hands out `new` when there is none."
+    await receive()
+    headers = dict(scope["headers"])
+    session = headers.get(b"mcp-session-id", b"new")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"mcp-session-id", session)],
+        }
+    )
+    await send({"type": "http.response.body", "body": session})
+
+
+def worker(index: int, ports: list[int]) -> httpx.AsyncClient:
+    app = SessionAffinity(echo_session, index=index, ports=ports)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://worker"
+    )
+
+
+@pytest.mark.asyncio
+async def test_own_sessions_are_tagged_and_untagged():
+    tag = f"w0p{os.getpid()}-"
+    async with worker(0, [0, 0]) as client:
+        created = await client.post("/mcp")
+        reused = await client.post("/mcp", headers={"mcp-session-id": tag + "abc"})
+
+    assert created.headers["mcp-session-id"] == tag + "new"
+    assert reused.text == "abc"
+    assert reused.headers["mcp-session-id"] == tag + "abc"
+
+
+@pytest.mark.asyncio
+async def test_sessions_of_a_replaced_process_are_not_found():
+    async with worker(0, [0, 0]) as client:
+        response = await client.post("/mcp", headers={"mcp-session-id": "w0p1-abc"})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_untagged_sessions_are_left_to_the_app():
+    async with worker(0, [0, 0]) as client:
+        response = await client.post("/mcp", headers={"mcp-session-id": "abc"})
+
+    assert response.text == "abc"
+
+
+@pytest.mark.asyncio
+async def test_sessions_of_other_workers_are_forwarded():
+    sock = bind_socket("127.0.0.1", 0)
+    ports = [0, sock.getsockname()[1]]
+    owner = uvicorn.Server(
+        uvicorn.Config(
+            SessionAffinity(echo_session, index=1, ports=ports),
+            lifespan="off",
+            log_level="warning",
+        )
+    )
+    serving = asyncio.ensure_future(owner.serve(sockets=[sock]))
+    while not owner.started:
+        await asyncio.sleep(0.01)
+
+    tag = f"w1p{os.getpid()}-"
+    try:
+        async with worker(0, ports) as client:
+            response = await client.post(
+                "/mcp", headers={"mcp-session-id": tag + "abc"}
+            )
+    finally:
+        owner.should_exit = True
+        await serving
+        sock.close()
+
+    assert response.text == "abc"
+    assert response.headers["mcp-session-id"] == tag + "abc"
+
+
+@pytest.mark.asyncio
+async def test_sessions_of_unreachable_workers_are_not_found():
+    sock = bind_socket("127.0.0.1", 0)
+    port = sock.getsockname()[1]
+    sock.close()
+
+    async with worker(0, [0, port]) as client:
+        response = await client.post("/mcp", headers={"mcp-session-id": "w1p1-abc"})
+
+    assert response.status_code == 404
+
+
+def broken_server():
+    raise RuntimeError("broken configuration")
+
+
+def test_restart_keeps_the_workers_when_a_successor_fails():
+    options = WorkerOptions(
+        create_server=broken_server,
+        transport="http",
+        path="/mcp",
+        log_level="warning",
+        stateless_http=False,
+        graceful_timeout=1,
+        middleware=[],
+    )
+    supervisor = Supervisor(options, workers=1, host="127.0.0.1", port=0)
+    old = multiprocessing.get_context("spawn").Process(target=time.sleep, args=(30,))
+    old.start()
+    ready = multiprocessing.get_context("spawn").Event()
+    ready.set()
+    supervisor._processes, supervisor._ready = [old], [ready]
+
+    try:
+        supervisor.restart()
+        assert supervisor._processes == [old]
+        assert old.is_alive()
+    finally:
+        supervisor._stop(old)
+        for sock in (supervisor.socket, *supervisor.private):
+            sock.close()